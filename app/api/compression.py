@@ -0,0 +1,198 @@
+import gzip
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.profiling import span
+
+# Brotli and zstd are used when their packages are installed, gzip always
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Never compressed: already compressed or streamed as produced
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "application/zip")
+
+
+def available_encoders(
+    gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 1
+) -> Dict[str, Callable[[bytes], bytes]]:
+    """Encoders by content-coding, in order of preference."""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=zstd_level)
+        encoders["zstd"] = compressor.compress
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    # mtime=0 keeps the output, and so the ETag, the same for the same body
+    encoders["gzip"] = lambda body: gzip.compress(
+        body, compresslevel=gzip_level, mtime=0
+    )
+    return encoders
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Pick the encoding the client weights highest, ties by our preference."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _etag_matches(if_none_match: str, etag_hash: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        # Representations differ only by content-coding suffix
+        if tag.strip('"').split("-", 1)[0] == etag_hash:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """Adds strong ETags, conditional GETs and content-coding to responses.
+
+    Complete responses are buffered, so streamed responses (more than one
+    body message, or text/event-stream) pass through untouched. GET and HEAD
+    responses with status 200 get an ETag hashed from the uncompressed body,
+    suffixed with the content-coding so each representation has its own
+    strong validator; a matching If-None-Match gets a 304 without a body.
+    Bodies of at least ``minimum_size`` bytes are compressed with the best
+    encoding the client accepts.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 1,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders(gzip_level, brotli_quality, zstd_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"]
+            if key in (b"accept-encoding", b"if-none-match")
+        }
+        conditional = scope["method"] in ("GET", "HEAD")
+        start_message = None
+        body_parts: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start_message = message
+                content_type = _header(message["headers"], b"content-type") or b""
+                if _header(message["headers"], b"content-encoding") or any(
+                    content_type.decode("latin-1").startswith(skip)
+                    for skip in SKIP_CONTENT_TYPES
+                ):
+                    passthrough = True
+                    await send(message)
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                if message.get("more_body", False) and len(body_parts) == 1:
+                    # Streaming response, send it as it comes
+                    passthrough = True
+                    await send(start_message)
+                    await send({**message, "body": body_parts.pop()})
+                elif not message.get("more_body", False):
+                    await self._send_buffered(
+                        send,
+                        start_message,
+                        b"".join(body_parts),
+                        request_headers,
+                        conditional,
+                    )
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_buffered(
+        self,
+        send,
+        start_message,
+        body: bytes,
+        request_headers: Dict[str, str],
+        conditional: bool,
+    ):
+        status = start_message["status"]
+        headers = [
+            (key, value)
+            for key, value in start_message["headers"]
+            if key not in (b"content-length", b"etag")
+        ]
+        compressible = len(body) >= self.minimum_size
+        encoding = None
+        if compressible:
+            encoding = negotiate(
+                request_headers.get("accept-encoding", ""), list(self.encoders)
+            )
+            headers.append((b"vary", b"Accept-Encoding"))
+
+        if conditional and status == 200:
+            etag_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+            etag = f'"{etag_hash}-{encoding}"' if encoding else f'"{etag_hash}"'
+            headers.append((b"etag", etag.encode("latin-1")))
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match and _etag_matches(if_none_match, etag_hash):
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [
+                            (key, value)
+                            for key, value in headers
+                            if key != b"content-type"
+                        ],
+                    }
+                )
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if encoding is not None:
+            with span("compression"):
+                body = self.encoders[encoding](body)
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
@@ -0,0 +1,64 @@
+from typing import Dict, Optional
+from fastapi import Header, HTTPException, Request
+from app.config import settings
+from app.services.address_index import AddressIndex
+from app.services.cobo_service import CoboService
+from app.services.backfill import TransactionBackfill
+from app.services.idempotency import IdempotencyStore
+from app.services.reconciler import WalletReconciler
+from app.services.registry import CoboServiceRegistry, load_tenants
+from app.services.transaction_store import TransactionStore
+
+cobo_service = CoboService.get_instance(
+    settings.COBO_API_SECRET, settings.COBO_ENV, settings.COBO_WEBHOOK_PUBLIC_KEY
+)
+# Address indexes by tenant namespace, kept when the registry evicts services
+address_indexes: Dict[str, AddressIndex] = {
+    cobo_service.namespace: cobo_service.address_index
+}
+registry = CoboServiceRegistry(
+    cobo_service,
+    load_tenants(settings.COBO_TENANTS_FILE),
+    max_tenants=settings.MAX_TENANTS,
+    idle_timeout=settings.TENANT_IDLE_TIMEOUT,
+    address_indexes=address_indexes,
+)
+# Shared by all tenants, keys are prefixed with the service namespace
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_DB, settings.IDEMPOTENCY_TTL)
+transaction_store = TransactionStore(settings.TRANSACTION_DB)
+# Latest backfill and the reconciler per tenant namespace. The registry may
+# replace a tenant's CoboService, so reconcilers are given the current one on
+# each run and backfills only hold theirs while running, when it is not evicted.
+backfills: Dict[str, TransactionBackfill] = {}
+reconcilers: Dict[str, WalletReconciler] = {}
+
+
+def get_reconciler(service: CoboService) -> WalletReconciler:
+    reconciler = reconcilers.get(service.namespace)
+    if reconciler is None:
+        reconciler = reconcilers[service.namespace] = WalletReconciler(
+            transaction_store,
+            concurrency=settings.RECONCILE_CONCURRENCY,
+            batch_size=settings.RECONCILE_BATCH_SIZE,
+            lookback=settings.RECONCILE_LOOKBACK,
+            balance_interval=settings.RECONCILE_BALANCE_INTERVAL,
+            reserve=settings.RECONCILE_RATE_RESERVE,
+            repair=settings.RECONCILE_REPAIR,
+        )
+    return reconciler
+
+
+def get_cobo_service(
+    request: Request, x_cobo_tenant: Optional[str] = Header(default=None)
+) -> CoboService:
+    """Select the tenant's CoboService from the path or the X-Cobo-Tenant header.
+
+    Requests without a tenant use the service configured from the environment.
+    """
+    tenant_id = request.path_params.get("tenant_id") or x_cobo_tenant
+    if tenant_id is None:
+        return cobo_service
+    try:
+        return registry.get(tenant_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
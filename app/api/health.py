@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.api.dependencies import cobo_service
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    ready = cobo_service.is_ready()
+    return JSONResponse(
+        content={
+            "status": "ready" if ready else "not_ready",
+            "warmed_up": cobo_service.warmed_up,
+            "circuit": cobo_service.circuit.state,
+        },
+        status_code=200 if ready else 503,
+    )
@@ -0,0 +1,87 @@
+import asyncio
+import random
+import threading
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.config import settings
+from app.services.profiling import (
+    RequestProfile,
+    SlowRequestLog,
+    current_profile,
+    sample_stacks,
+)
+
+router = APIRouter()
+slow_requests = SlowRequestLog(settings.PROFILING_TOP_N)
+
+
+class ProfilingMiddleware:
+    """Profiles a random ``sample_rate`` share of requests.
+
+    Sampled requests run with a RequestProfile in ``current_profile``, which
+    CoboService and the serialization and compression steps add their spans
+    to. Finished profiles are kept in ``log`` if they are among the slowest.
+    """
+
+    def __init__(self, app, log: SlowRequestLog, sample_rate: float = 0.01):
+        self.app = app
+        self.log = log
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile(scope["method"], scope["path"])
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            profile.finish(status)
+            self.log.record(profile)
+
+
+def _require_profiling():
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+
+@router.get("/debug/profiling/slow")
+async def slowest_requests(limit: int = Query(default=20, ge=1, le=1000)):
+    _require_profiling()
+    return JSONResponse(
+        content={
+            "status": "success",
+            "sample_rate": settings.PROFILING_SAMPLE_RATE,
+            "profiled": slow_requests.recorded,
+            "data": slow_requests.top(limit),
+        }
+    )
+
+
+@router.get("/debug/profiling/capture")
+async def capture_stacks(
+    seconds: float = Query(default=5, gt=0, le=60),
+    interval: float = Query(default=0.005, ge=0.001, le=1),
+    loop_only: bool = False,
+):
+    """Sample thread stacks for a while and return them as collapsed stacks."""
+    _require_profiling()
+    loop_thread = threading.get_ident()
+    stacks = await asyncio.to_thread(
+        sample_stacks, seconds, interval, [loop_thread] if loop_only else None
+    )
+    return PlainTextResponse(
+        "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+    )
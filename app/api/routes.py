@@ -1,12 +1,40 @@
-from fastapi import APIRouter, Request, Query
-from fastapi.responses import JSONResponse
-from app.services.cobo_service import CoboService
+import json
+import logging
+import time
+from fastapi import APIRouter, Depends, Request, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from app.config import settings
-from typing import Callable, Awaitable, Any, Optional, List, Dict
-from app.models.wallet import WalletType, WalletSubtype
+from app.api.dependencies import (
+    backfills,
+    get_cobo_service,
+    get_reconciler,
+    idempotency_store,
+    transaction_store,
+)
+from app.services.address_index import lookup_many
+from app.services.backfill import TransactionBackfill
+from app.services.cobo_service import CoboService
+from app.services.idempotency import IdempotencyConflict, fingerprint
+from app.services.profiling import span
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.transaction_watcher import TransactionWatchError
+from app.services.webhook_verifier import (
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    WebhookVerificationError,
+)
+from typing import Callable, Awaitable, Any, Optional
+from app.models.wallet import AddressLookupRequest, WalletType, WalletSubtype
+from app.models.transaction import (
+    TransferTransactionRequest,
+    ContractCallTransactionRequest,
+    MessageSignTransactionRequest,
+    BackfillRequest,
+    new_request_id,
+)
 
 router = APIRouter()
-cobo_service = CoboService.get_instance(settings.COBO_API_SECRET, settings.COBO_ENV)
+logger = logging.getLogger(__name__)
 
 
 async def execute_service_call(
@@ -14,17 +42,44 @@ async def execute_service_call(
 ) -> JSONResponse:
     try:
         result = await service_method(*args, **kwargs)
-        result_dict = result.to_dict() if hasattr(result, "to_dict") else result
-        if isinstance(result_dict, dict) and "data" in result_dict:
-            return JSONResponse(content={"status": "success", **result_dict})
-        else:
-            return JSONResponse(content={"status": "success", "data": result_dict})
+        with span("serialization"):
+            result_dict = result.to_dict() if hasattr(result, "to_dict") else result
+            if isinstance(result_dict, dict) and "data" in result_dict:
+                return JSONResponse(content={"status": "success", **result_dict})
+            else:
+                return JSONResponse(content={"status": "success", "data": result_dict})
+    except RateLimitExceeded as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)}, status_code=429
+        )
     except Exception as e:
         return JSONResponse(
             content={"status": "error", "message": str(e)}, status_code=500
         )
 
 
+async def execute_idempotent_call(
+    cobo_service: CoboService,
+    request_id: str,
+    request_fingerprint: str,
+    service_method: Callable[..., Awaitable[Any]],
+    *args,
+    **kwargs,
+) -> Response:
+    # Retries with the same request_id replay the stored response or join the
+    # call still in flight instead of writing upstream again
+    try:
+        return await idempotency_store.run(
+            f"{cobo_service.namespace}:{request_id}",
+            request_fingerprint,
+            lambda: execute_service_call(service_method, *args, **kwargs),
+        )
+    except IdempotencyConflict as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)}, status_code=409
+        )
+
+
 @router.get("/wallets")
 async def list_wallets(
     wallet_type: Optional[WalletType] = None,
@@ -34,6 +89,7 @@ async def list_wallets(
     limit: int = Query(default=10, ge=1, le=50),
     before: Optional[str] = None,
     after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
     return await execute_service_call(
         cobo_service.list_wallets,
@@ -47,8 +103,67 @@ async def list_wallets(
     )
 
 
+@router.get("/wallets/chains")
+async def list_supported_chains(
+    wallet_type: Optional[WalletType] = None,
+    wallet_subtype: Optional[WalletSubtype] = None,
+    chain_ids: Optional[str] = None,
+    token_list_id: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=50),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    return await execute_service_call(
+        cobo_service.list_supported_chains,
+        wallet_type,
+        wallet_subtype,
+        chain_ids,
+        token_list_id,
+        limit,
+        before,
+        after,
+    )
+
+
+@router.get("/wallets/tokens")
+async def list_supported_tokens(
+    wallet_type: Optional[WalletType] = None,
+    wallet_subtype: Optional[WalletSubtype] = None,
+    chain_ids: Optional[str] = None,
+    token_ids: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=50),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    return await execute_service_call(
+        cobo_service.list_supported_tokens,
+        wallet_type,
+        wallet_subtype,
+        chain_ids,
+        token_ids,
+        limit,
+        before,
+        after,
+    )
+
+
+@router.get("/wallets/check_address_validity")
+async def check_address_validity(
+    chain_id: str = Query(...),
+    address: str = Query(...),
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    return await execute_service_call(
+        cobo_service.check_address_validity, chain_id, address
+    )
+
+
 @router.get("/wallets/{wallet_id}")
-async def get_wallet_by_id(wallet_id: str):
+async def get_wallet_by_id(
+    wallet_id: str, cobo_service: CoboService = Depends(get_cobo_service)
+):
     return await execute_service_call(cobo_service.get_wallet_by_id, wallet_id)
 
 
@@ -59,6 +174,7 @@ async def get_wallet_balance(
     limit: int = Query(default=10, ge=1, le=50),
     before: Optional[str] = None,
     after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
     return await execute_service_call(
         cobo_service.get_wallet_balance, wallet_id, token_ids, limit, before, after
@@ -77,6 +193,7 @@ async def get_wallet_transactions(
     limit: int = Query(default=10, ge=1, le=50),
     before: Optional[str] = None,
     after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
     return await execute_service_call(
         cobo_service.get_wallet_transactions,
@@ -99,6 +216,7 @@ async def create_new_address(
     chain_id: str = Query(...),
     count: int = Query(default=1, ge=1, le=50),
     encoding: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
     return await execute_service_call(
         cobo_service.create_new_address, wallet_id, chain_id, count, encoding
@@ -113,6 +231,7 @@ async def list_wallet_addresses(
     limit: int = Query(default=10, ge=1, le=50),
     before: Optional[str] = None,
     after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
     return await execute_service_call(
         cobo_service.list_wallet_addresses,
@@ -137,9 +256,11 @@ async def withdraw_from_wallet(
     fee_token: Optional[str] = None,
     force_external: Optional[bool] = None,
     force_internal: Optional[bool] = None,
+    wallet_subtype: WalletSubtype = WalletSubtype.ORG_CONTROLLED,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
-    return await execute_service_call(
-        cobo_service.withdraw_from_wallet,
+    request_id = request_id or new_request_id()
+    params = (
         wallet_id,
         amount,
         token,
@@ -150,57 +271,14 @@ async def withdraw_from_wallet(
         fee_token,
         force_external,
         force_internal,
-    )
-
-
-@router.get("/wallets/chains")
-async def list_supported_chains(
-    wallet_type: Optional[WalletType] = None,
-    wallet_subtype: Optional[WalletSubtype] = None,
-    chain_ids: Optional[str] = None,
-    token_list_id: Optional[str] = None,
-    limit: int = Query(default=10, ge=1, le=50),
-    before: Optional[str] = None,
-    after: Optional[str] = None,
-):
-    return await execute_service_call(
-        cobo_service.list_supported_chains,
-        wallet_type,
         wallet_subtype,
-        chain_ids,
-        token_list_id,
-        limit,
-        before,
-        after,
     )
-
-
-@router.get("/wallets/tokens")
-async def list_supported_tokens(
-    wallet_type: Optional[WalletType] = None,
-    wallet_subtype: Optional[WalletSubtype] = None,
-    chain_ids: Optional[str] = None,
-    token_ids: Optional[str] = None,
-    limit: int = Query(default=10, ge=1, le=50),
-    before: Optional[str] = None,
-    after: Optional[str] = None,
-):
-    return await execute_service_call(
-        cobo_service.list_supported_tokens,
-        wallet_type,
-        wallet_subtype,
-        chain_ids,
-        token_ids,
-        limit,
-        before,
-        after,
-    )
-
-
-@router.get("/wallets/check_address_validity")
-async def check_address_validity(chain_id: str = Query(...), address: str = Query(...)):
-    return await execute_service_call(
-        cobo_service.check_address_validity, chain_id, address
+    return await execute_idempotent_call(
+        cobo_service,
+        request_id,
+        fingerprint("withdraw", *params),
+        cobo_service.withdraw_from_wallet,
+        *params,
     )
 
 
@@ -223,6 +301,7 @@ async def list_transactions(
     limit: int = Query(default=10, ge=1, le=50),
     before: Optional[str] = None,
     after: Optional[str] = None,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
     return await execute_service_call(
         cobo_service.list_transactions,
@@ -247,97 +326,260 @@ async def list_transactions(
 
 
 @router.get("/transactions/{transaction_id}")
-async def get_transaction_by_id(transaction_id: str):
+async def get_transaction_by_id(
+    transaction_id: str, cobo_service: CoboService = Depends(get_cobo_service)
+):
     return await execute_service_call(
         cobo_service.get_transaction_by_id, transaction_id
     )
 
 
+@router.get("/transactions/{transaction_id}/watch")
+async def watch_transaction(
+    transaction_id: str,
+    status: Optional[str] = None,
+    timeout: float = Query(default=30, ge=0, le=60),
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    # Long-poll: returns as soon as the transaction status differs from `status`
+    try:
+        snapshot = await cobo_service.transaction_watcher.wait(
+            transaction_id, status, timeout
+        )
+    except TransactionWatchError as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)},
+            status_code=404 if e.status == 404 else 502,
+        )
+    return JSONResponse(content={"status": "success", **snapshot})
+
+
+@router.get("/transactions/{transaction_id}/events")
+async def stream_transaction_events(
+    transaction_id: str, cobo_service: CoboService = Depends(get_cobo_service)
+):
+    async def event_stream():
+        try:
+            async for snapshot in cobo_service.transaction_watcher.stream(
+                transaction_id
+            ):
+                if snapshot is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: status\ndata: {json.dumps(snapshot, default=str)}\n\n"
+        except TransactionWatchError as e:
+            error = {"message": str(e), "status": e.status}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @router.post("/transactions/transfer")
 async def create_transfer_transaction(
-    request_id: str,
-    source_wallet_id: str,
-    source_address: str,
-    destination_address: str,
-    token_id: str,
-    amount: str,
-    fee_rate: Optional[str] = None,
-    max_fee: Optional[str] = None,
-    utxo_outputs: Optional[List[Dict[str, Any]]] = None,
-    memo: Optional[str] = None,
-    note: Optional[str] = None,
-    extra_parameters: Optional[Dict[str, Any]] = None,
+    transfer: TransferTransactionRequest,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
-    return await execute_service_call(
+    return await execute_idempotent_call(
+        cobo_service,
+        transfer.request_id,
+        fingerprint("transfer", transfer.model_dump_json(exclude={"request_id"})),
         cobo_service.create_transfer_transaction,
-        request_id,
-        source_wallet_id,
-        source_address,
-        destination_address,
-        token_id,
-        amount,
-        fee_rate,
-        max_fee,
-        utxo_outputs,
-        memo,
-        note,
-        extra_parameters,
+        transfer,
     )
 
 
 @router.post("/transactions/contract_call")
 async def create_contract_call_transaction(
-    request_id: str,
-    source_wallet_id: str,
-    source_address: str,
-    destination_address: str,
-    token_id: str,
-    amount: str,
-    calldata: str,
-    fee_rate: Optional[str] = None,
-    max_fee: Optional[str] = None,
-    gas_limit: Optional[int] = None,
-    note: Optional[str] = None,
-    extra_parameters: Optional[Dict[str, Any]] = None,
+    contract_call: ContractCallTransactionRequest,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
-    return await execute_service_call(
+    return await execute_idempotent_call(
+        cobo_service,
+        contract_call.request_id,
+        fingerprint(
+            "contract_call", contract_call.model_dump_json(exclude={"request_id"})
+        ),
         cobo_service.create_contract_call_transaction,
-        request_id,
-        source_wallet_id,
-        source_address,
-        destination_address,
-        token_id,
-        amount,
-        calldata,
-        fee_rate,
-        max_fee,
-        gas_limit,
-        note,
-        extra_parameters,
+        contract_call,
     )
 
 
 @router.post("/transactions/message_sign")
 async def create_message_sign_transaction(
-    request_id: str,
-    source_wallet_id: str,
-    source_address: str,
-    message: str,
-    note: Optional[str] = None,
-    extra_parameters: Optional[Dict[str, Any]] = None,
+    message_sign: MessageSignTransactionRequest,
+    cobo_service: CoboService = Depends(get_cobo_service),
 ):
-    return await execute_service_call(
+    return await execute_idempotent_call(
+        cobo_service,
+        message_sign.request_id,
+        fingerprint(
+            "message_sign", message_sign.model_dump_json(exclude={"request_id"})
+        ),
         cobo_service.create_message_sign_transaction,
-        request_id,
-        source_wallet_id,
-        source_address,
-        message,
-        note,
-        extra_parameters,
+        message_sign,
+    )
+
+
+@router.post("/backfill")
+async def start_backfill(
+    backfill_request: BackfillRequest,
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    # Runs in the background, poll GET /backfill for progress
+    backfill = backfills.get(cobo_service.namespace)
+    if backfill is not None and backfill.running:
+        return JSONResponse(
+            content={"status": "error", "message": "A backfill is already running"},
+            status_code=409,
+        )
+    backfill = TransactionBackfill(
+        cobo_service,
+        transaction_store,
+        backfill_request.start_timestamp,
+        backfill_request.end_timestamp or int(time.time() * 1000),
+        window=backfill_request.window,
+        concurrency=backfill_request.concurrency,
+        reserve=settings.BACKFILL_RATE_RESERVE,
+    )
+    backfills[cobo_service.namespace] = backfill
+    cobo_service.track_background(backfill.start())
+    return JSONResponse(
+        content={"status": "success", "data": backfill.status()}, status_code=202
+    )
+
+
+@router.get("/backfill")
+async def get_backfill_status(cobo_service: CoboService = Depends(get_cobo_service)):
+    backfill = backfills.get(cobo_service.namespace)
+    if backfill is None:
+        return JSONResponse(
+            content={"status": "error", "message": "No backfill has been started"},
+            status_code=404,
+        )
+    return JSONResponse(content={"status": "success", "data": backfill.status()})
+
+
+@router.post("/reconciliation")
+async def run_reconciliation(cobo_service: CoboService = Depends(get_cobo_service)):
+    # Checks the next batch of wallets now, continuing the current pass
+    return await execute_service_call(
+        get_reconciler(cobo_service).run_once, cobo_service
+    )
+
+
+@router.get("/reconciliation")
+async def get_reconciliation_report(
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    reconciler = get_reconciler(cobo_service)
+    return JSONResponse(
+        content={
+            "status": "success",
+            "data": {"current": reconciler.report, "last": reconciler.last_report},
+        }
     )
 
 
+@router.post("/addresses/index")
+async def rebuild_address_index(cobo_service: CoboService = Depends(get_cobo_service)):
+    # Runs in the background, lookups keep using the index while it fills
+    address_index = cobo_service.address_index
+    if address_index.building:
+        return JSONResponse(
+            content={"status": "error", "message": "The index is already building"},
+            status_code=409,
+        )
+    cobo_service.track_background(
+        address_index.start_rebuild(
+            cobo_service,
+            settings.ADDRESS_INDEX_CONCURRENCY,
+            settings.ADDRESS_INDEX_RATE_RESERVE,
+        )
+    )
+    return JSONResponse(
+        content={"status": "success", "data": address_index.status()},
+        status_code=202,
+    )
+
+
+@router.get("/addresses/index")
+async def get_address_index_status(
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    return JSONResponse(
+        content={"status": "success", "data": cobo_service.address_index.status()}
+    )
+
+
+@router.post("/addresses/lookup")
+async def lookup_addresses(
+    lookup_request: AddressLookupRequest,
+    cobo_service: CoboService = Depends(get_cobo_service),
+):
+    """Find the wallets owning the given addresses, without upstream calls."""
+    address_index = cobo_service.address_index
+    if len(lookup_request.addresses) > settings.ADDRESS_LOOKUP_MAX:
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": f"At most {settings.ADDRESS_LOOKUP_MAX} addresses "
+                "can be looked up at once",
+            },
+            status_code=413,
+        )
+    if not address_index.ready:
+        # Until a build completes, a miss could be an address not indexed yet
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": "The address index has not been built",
+            },
+            status_code=503,
+        )
+    results = lookup_many(
+        address_index,
+        [
+            (query.address, query.chain_id, query.memo)
+            for query in lookup_request.addresses
+        ],
+    )
+    return JSONResponse(content={"status": "success", "data": results})
+
+
 @router.post("/webhook")
-async def handle_webhook(request: Request):
-    payload = await request.json()
+async def handle_webhook(
+    request: Request, cobo_service: CoboService = Depends(get_cobo_service)
+):
+    # Verify the raw bytes before spending anything on JSON parsing
+    body = await request.body()
+    if cobo_service.webhook_verifier is None:
+        logger.error("Rejecting webhook: no webhook public key configured")
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": "Webhook verification not configured",
+            },
+            status_code=503,
+        )
+    try:
+        cobo_service.webhook_verifier.verify(
+            body,
+            request.headers.get(TIMESTAMP_HEADER),
+            request.headers.get(SIGNATURE_HEADER),
+        )
+    except WebhookVerificationError as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)}, status_code=401
+        )
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JSONResponse(
+            content={"status": "error", "message": "Invalid JSON payload"},
+            status_code=400,
+        )
     return await execute_service_call(cobo_service.handle_webhook, payload)
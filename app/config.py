@@ -11,6 +11,81 @@ class Settings:
     COBO_API_KEY: str = os.getenv("COBO_API_KEY")
     COBO_API_SECRET: str = os.getenv("COBO_API_SECRET")
     COBO_ENV: str = os.getenv("COBO_ENV", "development")
+    # Cobo's webhook public key for COBO_ENV, webhooks are rejected without it
+    COBO_WEBHOOK_PUBLIC_KEY: str = os.getenv("COBO_WEBHOOK_PUBLIC_KEY")
+    WEBHOOK_TOLERANCE: float = float(os.getenv("WEBHOOK_TOLERANCE", "300"))
+    # Number of upstream connections opened concurrently during warm-up
+    WARMUP_CONNECTIONS: int = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+    WARMUP_RETRY_INTERVAL: float = float(os.getenv("WARMUP_RETRY_INTERVAL", "5"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+    # Upstream calls per second per tenant, 0 disables limiting
+    RATE_LIMIT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_PER_SECOND", "20"))
+    # Longest a request waits for rate-limit budget before failing with 429
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "1"))
+    # JSON file mapping tenant IDs to {"api_secret", "env", "rate_limit"}
+    COBO_TENANTS_FILE: str = os.getenv("COBO_TENANTS_FILE")
+    MAX_TENANTS: int = int(os.getenv("MAX_TENANTS", "32"))
+    TENANT_IDLE_TIMEOUT: float = float(os.getenv("TENANT_IDLE_TIMEOUT", "600"))
+    # Bounds of the adaptive interval used to poll watched transactions
+    TRANSACTION_POLL_MIN_INTERVAL: float = float(
+        os.getenv("TRANSACTION_POLL_MIN_INTERVAL", "1")
+    )
+    TRANSACTION_POLL_MAX_INTERVAL: float = float(
+        os.getenv("TRANSACTION_POLL_MAX_INTERVAL", "30")
+    )
+
+    # SQLite file storing responses to write requests by request_id, kept in
+    # memory (and lost on restart) when unset
+    IDEMPOTENCY_DB: str = os.getenv("IDEMPOTENCY_DB", ":memory:")
+    IDEMPOTENCY_TTL: float = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+
+    # SQLite file holding the local copy of transactions filled by backfills
+    TRANSACTION_DB: str = os.getenv("TRANSACTION_DB", ":memory:")
+    # Share of the rate-limit budget backfills leave to interactive calls
+    BACKFILL_RATE_RESERVE: float = float(os.getenv("BACKFILL_RATE_RESERVE", "0.5"))
+
+    # Seconds between scheduled reconciliation runs, 0 disables them
+    RECONCILE_INTERVAL: float = float(os.getenv("RECONCILE_INTERVAL", "0"))
+    # Wallets checked per run; a full pass spans as many runs as needed
+    RECONCILE_BATCH_SIZE: int = int(os.getenv("RECONCILE_BATCH_SIZE", "1000"))
+    RECONCILE_CONCURRENCY: int = int(os.getenv("RECONCILE_CONCURRENCY", "4"))
+    # How far back transactions are compared, in seconds
+    RECONCILE_LOOKBACK: float = float(os.getenv("RECONCILE_LOOKBACK", "86400"))
+    # Balances of wallets without activity are rechecked after this many seconds
+    RECONCILE_BALANCE_INTERVAL: float = float(
+        os.getenv("RECONCILE_BALANCE_INTERVAL", "86400")
+    )
+    # Share of the rate-limit budget reconciliation leaves to interactive calls
+    RECONCILE_RATE_RESERVE: float = float(os.getenv("RECONCILE_RATE_RESERVE", "0.5"))
+    # Write transactions found missing or stale into the local store
+    RECONCILE_REPAIR: bool = os.getenv("RECONCILE_REPAIR", "false").lower() == "true"
+
+    # Build the address index of the default tenant at startup
+    ADDRESS_INDEX_ON_STARTUP: bool = (
+        os.getenv("ADDRESS_INDEX_ON_STARTUP", "false").lower() == "true"
+    )
+    ADDRESS_INDEX_CONCURRENCY: int = int(os.getenv("ADDRESS_INDEX_CONCURRENCY", "4"))
+    # Share of the rate-limit budget index builds leave to interactive calls
+    ADDRESS_INDEX_RATE_RESERVE: float = float(
+        os.getenv("ADDRESS_INDEX_RATE_RESERVE", "0.5")
+    )
+    # Addresses accepted by one lookup request
+    ADDRESS_LOOKUP_MAX: int = int(os.getenv("ADDRESS_LOOKUP_MAX", "10000"))
+
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    # Used when the optional brotli and zstandard packages are installed
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "4"))
+    ZSTD_LEVEL: int = int(os.getenv("ZSTD_LEVEL", "1"))
+
+    # Opt-in request profiling and the /debug/profiling endpoints
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    # Share of requests profiled while enabled
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+    # Number of slowest profiled requests kept
+    PROFILING_TOP_N: int = int(os.getenv("PROFILING_TOP_N", "50"))
 
 
 settings = Settings()
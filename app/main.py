@@ -1,6 +1,13 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.compression import CompressionMiddleware
 from app.api.routes import router as api_router
+from app.api.dependencies import cobo_service, get_reconciler
+from app.api.health import router as health_router
+from app.api.profiling import ProfilingMiddleware, slow_requests
+from app.api.profiling import router as profiling_router
 import logging
 from app.config import settings
 
@@ -11,7 +18,49 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_until_ready():
+    while True:
+        try:
+            await cobo_service.warm_up()
+            return
+        except Exception as e:
+            logger.warning(
+                f"Warm-up failed, retrying in {settings.WARMUP_RETRY_INTERVAL}s: {e}"
+            )
+            await asyncio.sleep(settings.WARMUP_RETRY_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /healthz answers while /readyz reports 503
+    warm_up_task = asyncio.create_task(warm_up_until_ready())
+    reconcile_task = None
+    if settings.RECONCILE_INTERVAL > 0:
+        reconcile_task = asyncio.create_task(
+            get_reconciler(cobo_service).run_forever(
+                lambda: cobo_service, settings.RECONCILE_INTERVAL
+            )
+        )
+    if settings.ADDRESS_INDEX_ON_STARTUP:
+        cobo_service.track_background(
+            cobo_service.address_index.start_rebuild(
+                cobo_service,
+                settings.ADDRESS_INDEX_CONCURRENCY,
+                settings.ADDRESS_INDEX_RATE_RESERVE,
+            )
+        )
+    yield
+    warm_up_task.cancel()
+    if cobo_service.address_index.building:
+        cobo_service.address_index.task.cancel()
+    if reconcile_task is not None:
+        reconcile_task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add middlewares
 app.add_middleware(
@@ -21,8 +70,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+    zstd_level=settings.ZSTD_LEVEL,
+)
+# Outermost, so profiles include compression; not installed when disabled
+if settings.PROFILING_ENABLED and settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        log=slow_requests,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+    )
 
 app.include_router(api_router, prefix="/api")
+# Same API scoped to a tenant configured in COBO_TENANTS_FILE
+app.include_router(api_router, prefix="/api/tenants/{tenant_id}")
+app.include_router(health_router)
+app.include_router(profiling_router)
 
 
 @app.get("/")
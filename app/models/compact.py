@@ -0,0 +1,209 @@
+import sys
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+# Compact in-memory representations for caches and local indexes.
+#
+# Amounts are kept as integer minor units plus the number of decimals instead
+# of floats. from_sdk() reads attributes straight off SDK models without going
+# through to_dict(): unique strings such as transaction IDs are shared with the
+# SDK object rather than copied, and IDs that repeat across many records
+# (wallets, chains, tokens) are interned so each is stored once.
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def _enum_value(value: Any) -> Optional[str]:
+    return value.value if value is not None else None
+
+
+def parse_amount(
+    value: Optional[str], decimals: Optional[int] = None
+) -> Tuple[int, int]:
+    """Parse a decimal amount string into ``(minor_units, decimals)``.
+
+    ``decimals`` is the token's precision when known. The string's own scale is
+    used if it is finer, so no precision is ever lost.
+    """
+    if not value:
+        return 0, decimals or 0
+    amount = Decimal(value)
+    scale = max(-amount.as_tuple().exponent, 0)
+    decimals = scale if decimals is None else max(decimals, scale)
+    return int(amount.scaleb(decimals)), decimals
+
+
+def format_amount(minor_units: int, decimals: int) -> Decimal:
+    # str() of the result may use an exponent ("0E-18", "5E-8"); render with
+    # format(amount, "f") wherever it becomes a string
+    return Decimal(minor_units).scaleb(-decimals)
+
+
+def _destination_amount(destination: Any) -> Optional[str]:
+    destination = getattr(destination, "actual_instance", destination)
+    if destination is None:
+        return None
+    amount = getattr(destination, "amount", None) or getattr(destination, "value", None)
+    if amount is not None:
+        return amount
+    account_output = getattr(destination, "account_output", None)
+    if account_output is not None:
+        return account_output.amount
+    utxo_outputs = getattr(destination, "utxo_outputs", None)
+    if utxo_outputs:
+        return str(sum(Decimal(output.amount or 0) for output in utxo_outputs))
+    return None
+
+
+class CompactWallet:
+    __slots__ = ("wallet_id", "wallet_type", "wallet_subtype", "name")
+
+    def __init__(self, wallet_id, wallet_type, wallet_subtype, name):
+        self.wallet_id = wallet_id
+        self.wallet_type = wallet_type
+        self.wallet_subtype = wallet_subtype
+        self.name = name
+
+    @classmethod
+    def from_sdk(cls, wallet_info: Any) -> "CompactWallet":
+        wallet = getattr(wallet_info, "actual_instance", None) or wallet_info
+        return cls(
+            wallet.wallet_id,
+            _enum_value(wallet.wallet_type),
+            _enum_value(wallet.wallet_subtype),
+            wallet.name,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class CompactBalance:
+    __slots__ = (
+        "wallet_id",
+        "token_id",
+        "decimals",
+        "total",
+        "available",
+        "pending",
+        "locked",
+    )
+
+    def __init__(
+        self, wallet_id, token_id, decimals, total, available, pending, locked
+    ):
+        self.wallet_id = wallet_id
+        self.token_id = token_id
+        self.decimals = decimals
+        self.total = total
+        self.available = available
+        self.pending = pending
+        self.locked = locked
+
+    @classmethod
+    def from_sdk(
+        cls, wallet_id: str, token_balance: Any, decimals: Optional[int] = None
+    ) -> "CompactBalance":
+        balance = token_balance.balance
+        # All four fields share the largest scale so they can be compared
+        for value in (
+            balance.total,
+            balance.available,
+            balance.pending,
+            balance.locked,
+        ):
+            _, decimals = parse_amount(value, decimals)
+        return cls(
+            _intern(wallet_id),
+            _intern(token_balance.token_id),
+            decimals,
+            parse_amount(balance.total, decimals)[0],
+            parse_amount(balance.available, decimals)[0],
+            parse_amount(balance.pending, decimals)[0],
+            parse_amount(balance.locked, decimals)[0],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wallet_id": self.wallet_id,
+            "token_id": self.token_id,
+            "total": format(format_amount(self.total, self.decimals), "f"),
+            "available": format(format_amount(self.available, self.decimals), "f"),
+            "pending": format(format_amount(self.pending, self.decimals), "f"),
+            "locked": format(format_amount(self.locked, self.decimals), "f"),
+        }
+
+
+class CompactTransaction:
+    __slots__ = (
+        "transaction_id",
+        "wallet_id",
+        "type",
+        "status",
+        "chain_id",
+        "token_id",
+        "amount",
+        "decimals",
+        "transaction_hash",
+        "created_timestamp",
+        "updated_timestamp",
+    )
+
+    def __init__(
+        self,
+        transaction_id,
+        wallet_id,
+        type,
+        status,
+        chain_id,
+        token_id,
+        amount,
+        decimals,
+        transaction_hash,
+        created_timestamp,
+        updated_timestamp,
+    ):
+        self.transaction_id = transaction_id
+        self.wallet_id = wallet_id
+        self.type = type
+        self.status = status
+        self.chain_id = chain_id
+        self.token_id = token_id
+        self.amount = amount
+        self.decimals = decimals
+        self.transaction_hash = transaction_hash
+        self.created_timestamp = created_timestamp
+        self.updated_timestamp = updated_timestamp
+
+    @classmethod
+    def from_sdk(
+        cls, transaction: Any, decimals: Optional[int] = None
+    ) -> "CompactTransaction":
+        amount, decimals = parse_amount(
+            _destination_amount(transaction.destination), decimals
+        )
+        return cls(
+            transaction.transaction_id,
+            _intern(transaction.wallet_id),
+            _enum_value(transaction.type),
+            _enum_value(transaction.status),
+            _intern(transaction.chain_id),
+            _intern(transaction.token_id),
+            amount,
+            decimals,
+            transaction.transaction_hash,
+            transaction.created_timestamp,
+            transaction.updated_timestamp,
+        )
+
+    @property
+    def amount_decimal(self) -> Decimal:
+        return format_amount(self.amount, self.decimals)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {slot: getattr(self, slot) for slot in self.__slots__}
+        del result["decimals"]
+        result["amount"] = format(self.amount_decimal, "f")
+        return result
@@ -0,0 +1,224 @@
+import uuid
+from typing import List, Optional
+
+from cobo_waas2 import models as sdk
+from pydantic import BaseModel, Field, model_validator
+
+from app.models.wallet import WalletSubtype
+
+# Request bodies for the write endpoints. FastAPI validates them once; to_sdk()
+# then assembles the SDK request objects with model_construct, so the payload
+# (which may carry large calldata or messages) is neither copied into
+# intermediate dicts nor validated a second time by the SDK.
+
+MPC_SUBTYPES = {WalletSubtype.ORG_CONTROLLED, WalletSubtype.USER_CONTROLLED}
+CUSTODIAL_SUBTYPES = {WalletSubtype.ASSET, WalletSubtype.WEB3}
+
+
+def new_request_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _wrap(wrapper, instance):
+    # oneOf wrappers in the SDK only hold the concrete model
+    return wrapper.model_construct(actual_instance=instance)
+
+
+class UtxoOutput(BaseModel):
+    address: str
+    amount: Optional[str] = None
+    script: Optional[str] = None
+
+
+class TransferTransactionRequest(BaseModel):
+    # Generated when absent; reuse it when retrying to avoid duplicate writes
+    request_id: str = Field(default_factory=new_request_id)
+    source_wallet_id: str
+    source_wallet_subtype: WalletSubtype = WalletSubtype.ORG_CONTROLLED
+    source_address: Optional[str] = None
+    destination_address: str
+    token_id: str
+    amount: str
+    # UTXO fee rate in sat/vByte; without it max_fee is sent as a fixed fee
+    fee_rate: Optional[str] = None
+    max_fee: Optional[str] = None
+    fee_token_id: Optional[str] = None
+    utxo_outputs: Optional[List[UtxoOutput]] = None
+    memo: Optional[str] = None
+    note: Optional[str] = None
+    force_internal: Optional[bool] = None
+    force_external: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_source_wallet_subtype(self):
+        if self.source_wallet_subtype not in MPC_SUBTYPES | CUSTODIAL_SUBTYPES:
+            raise ValueError(
+                f"Transfers from {self.source_wallet_subtype.value} wallets are not supported"
+            )
+        return self
+
+    def to_sdk(self) -> sdk.TransferParams:
+        source_type = sdk.WalletSubtype(self.source_wallet_subtype.value)
+        if self.source_wallet_subtype in MPC_SUBTYPES:
+            source = sdk.MpcTransferSource.model_construct(
+                source_type=source_type,
+                wallet_id=self.source_wallet_id,
+                address=self.source_address,
+            )
+        else:
+            source = sdk.CustodialTransferSource.model_construct(
+                source_type=source_type, wallet_id=self.source_wallet_id
+            )
+        destination = sdk.AddressTransferDestination.model_construct(
+            destination_type=sdk.TransferDestinationType.ADDRESS,
+            account_output=None
+            if self.utxo_outputs
+            else sdk.AddressTransferDestinationAccountOutput.model_construct(
+                address=self.destination_address, amount=self.amount, memo=self.memo
+            ),
+            utxo_outputs=[
+                sdk.AddressTransferDestinationUtxoOutputsInner.model_construct(
+                    address=output.address, amount=output.amount, script=output.script
+                )
+                for output in self.utxo_outputs
+            ]
+            if self.utxo_outputs
+            else None,
+            force_internal=self.force_internal,
+            force_external=self.force_external,
+        )
+        fee = None
+        fee_token_id = self.fee_token_id or self.token_id
+        if self.fee_rate is not None:
+            fee = sdk.TransactionRequestUtxoFee.model_construct(
+                fee_type=sdk.FeeType.UTXO,
+                fee_rate=self.fee_rate,
+                token_id=fee_token_id,
+                max_fee_amount=self.max_fee,
+            )
+        elif self.max_fee is not None:
+            fee = sdk.TransactionRequestFixedFee.model_construct(
+                fee_type=sdk.FeeType.FIXED,
+                token_id=fee_token_id,
+                max_fee_amount=self.max_fee,
+            )
+        return sdk.TransferParams.model_construct(
+            request_id=self.request_id,
+            source=_wrap(sdk.TransferSource, source),
+            token_id=self.token_id,
+            destination=_wrap(sdk.TransferDestination, destination),
+            description=self.note,
+            fee=_wrap(sdk.TransactionRequestFee, fee) if fee else None,
+        )
+
+
+class ContractCallTransactionRequest(BaseModel):
+    request_id: str = Field(default_factory=new_request_id)
+    chain_id: str
+    source_wallet_id: str
+    source_wallet_subtype: WalletSubtype = WalletSubtype.ORG_CONTROLLED
+    source_address: str
+    destination_address: str
+    amount: Optional[str] = None
+    calldata: str
+    # EIP-1559 fees take precedence over a legacy gas price
+    max_fee_per_gas: Optional[str] = None
+    max_priority_fee_per_gas: Optional[str] = None
+    gas_price: Optional[str] = None
+    gas_limit: Optional[int] = None
+    fee_token_id: Optional[str] = None
+    note: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.source_wallet_subtype not in MPC_SUBTYPES:
+            raise ValueError("Contract calls require an MPC source wallet")
+        if (self.max_fee_per_gas or self.gas_price) and not self.fee_token_id:
+            raise ValueError("fee_token_id is required when specifying a fee")
+        if self.max_fee_per_gas and not self.max_priority_fee_per_gas:
+            raise ValueError(
+                "max_priority_fee_per_gas is required with max_fee_per_gas"
+            )
+        return self
+
+    def to_sdk(self) -> sdk.ContractCallParams:
+        source = sdk.MpcContractCallSource.model_construct(
+            source_type=sdk.ContractCallSourceType(self.source_wallet_subtype.value),
+            wallet_id=self.source_wallet_id,
+            address=self.source_address,
+        )
+        destination = sdk.EvmContractCallDestination.model_construct(
+            destination_type=sdk.ContractCallDestinationType.EVM_CONTRACT,
+            address=self.destination_address,
+            value=self.amount,
+            calldata=self.calldata,
+        )
+        gas_limit = str(self.gas_limit) if self.gas_limit is not None else None
+        fee = None
+        if self.max_fee_per_gas:
+            fee = sdk.TransactionRequestEvmEip1559Fee.model_construct(
+                fee_type=sdk.FeeType.EVM_EIP_1559,
+                max_fee_per_gas=self.max_fee_per_gas,
+                max_priority_fee_per_gas=self.max_priority_fee_per_gas,
+                token_id=self.fee_token_id,
+                gas_limit=gas_limit,
+            )
+        elif self.gas_price:
+            fee = sdk.TransactionRequestEvmLegacyFee.model_construct(
+                fee_type=sdk.FeeType.EVM_LEGACY,
+                gas_price=self.gas_price,
+                token_id=self.fee_token_id,
+                gas_limit=gas_limit,
+            )
+        return sdk.ContractCallParams.model_construct(
+            request_id=self.request_id,
+            chain_id=self.chain_id,
+            source=_wrap(sdk.ContractCallSource, source),
+            destination=_wrap(sdk.ContractCallDestination, destination),
+            description=self.note,
+            fee=_wrap(sdk.TransactionRequestFee, fee) if fee else None,
+        )
+
+
+class MessageSignTransactionRequest(BaseModel):
+    request_id: str = Field(default_factory=new_request_id)
+    chain_id: str
+    source_wallet_id: str
+    source_wallet_subtype: WalletSubtype = WalletSubtype.ORG_CONTROLLED
+    source_address: str
+    # Base64 encoded raw message, signed as an EIP-191 personal message
+    message: str
+    note: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_source_wallet_subtype(self):
+        if self.source_wallet_subtype not in MPC_SUBTYPES:
+            raise ValueError("Message signing requires an MPC source wallet")
+        return self
+
+    def to_sdk(self) -> sdk.MessageSignParams:
+        source = sdk.MpcMessageSignSource.model_construct(
+            source_type=sdk.MessageSignSourceType(self.source_wallet_subtype.value),
+            wallet_id=self.source_wallet_id,
+            address=self.source_address,
+        )
+        destination = sdk.EvmEIP191MessageSignDestination.model_construct(
+            destination_type=sdk.MessageSignDestinationType.EVM_EIP_191_SIGNATURE,
+            message=self.message,
+        )
+        return sdk.MessageSignParams.model_construct(
+            request_id=self.request_id,
+            chain_id=self.chain_id,
+            source=_wrap(sdk.MessageSignSource, source),
+            destination=_wrap(sdk.MessageSignDestination, destination),
+            description=self.note,
+        )
+
+
+class BackfillRequest(BaseModel):
+    # Milliseconds since the epoch, the end defaults to now
+    start_timestamp: int = Field(ge=0)
+    end_timestamp: Optional[int] = None
+    # Window size in seconds
+    window: float = Field(default=86400, gt=0)
+    concurrency: int = Field(default=4, ge=1, le=16)
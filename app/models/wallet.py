@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from enum import Enum
 
 
@@ -37,3 +37,14 @@ class Transaction(BaseModel):
     amount: float
     token: str
     timestamp: int
+
+
+class AddressQuery(BaseModel):
+    address: str
+    # Searched on every chain when omitted
+    chain_id: Optional[str] = None
+    memo: Optional[str] = None
+
+
+class AddressLookupRequest(BaseModel):
+    addresses: List[AddressQuery]
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import re
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.compact import CompactWallet
+from app.services.rate_limiter import background_priority
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+_HEX_ADDRESS = re.compile(r"0[xX][0-9a-fA-F]+")
+_BECH32_ADDRESS = re.compile(r"[a-z]{1,83}1[ac-hj-np-z02-9]{6,}")
+
+
+def normalize_address(address: str) -> str:
+    """Canonical form for matching: case-insensitive formats are lowercased.
+
+    Hex (EVM style) and bech32 addresses ignore case; others, such as base58,
+    are case-sensitive and kept as they are.
+    """
+    address = address.strip()
+    if _HEX_ADDRESS.fullmatch(address):
+        return address.lower()
+    lowered = address.lower()
+    if address in (lowered, address.upper()) and _BECH32_ADDRESS.fullmatch(lowered):
+        return lowered
+    return address
+
+
+class AddressIndex:
+    """Maps (chain_id, address) to the owning wallet, in memory.
+
+    Entries live in one dict per chain keyed by the normalized address (plus
+    the memo on memo-based chains), with chain and wallet IDs interned, so
+    resolving an address is two dict lookups. Addresses are never removed
+    from a wallet upstream, so the index only grows: rebuild() pages through
+    every wallet's addresses into the live index while lookups keep being
+    served, and addresses created through this service are added as soon as
+    they are returned.
+    """
+
+    def __init__(self):
+        self._chains: Dict[str, Dict[str, str]] = {}
+        self.ready = False
+        self.wallets_indexed = 0
+        self.built_at: Optional[float] = None
+        self.build_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(address: str, memo: Optional[str]) -> str:
+        address = normalize_address(address)
+        return f"{address}\x00{memo}" if memo else address
+
+    def add(
+        self, chain_id: str, address: str, wallet_id: str, memo: Optional[str] = None
+    ):
+        chain = self._chains.get(chain_id)
+        if chain is None:
+            chain = self._chains[sys.intern(chain_id)] = {}
+        chain[self._key(address, memo)] = sys.intern(wallet_id)
+
+    def add_addresses(self, wallet_id: str, addresses: Iterable[Any]):
+        """Index AddressInfo models returned by the SDK."""
+        for info in addresses or []:
+            if info.address and info.chain_id:
+                self.add(info.chain_id, info.address, wallet_id, info.memo)
+
+    def lookup(
+        self, address: str, chain_id: Optional[str] = None, memo: Optional[str] = None
+    ) -> Optional[Tuple[str, str]]:
+        """Return ``(chain_id, wallet_id)`` of the address, or None.
+
+        Without ``chain_id`` every chain is searched and the first match is
+        returned.
+        """
+        key = self._key(address, memo)
+        if chain_id is not None:
+            wallet_id = self._chains.get(chain_id, {}).get(key)
+            return (chain_id, wallet_id) if wallet_id is not None else None
+        for chain_id, chain in self._chains.items():
+            wallet_id = chain.get(key)
+            if wallet_id is not None:
+                return chain_id, wallet_id
+        return None
+
+    def __len__(self):
+        return sum(len(chain) for chain in self._chains.values())
+
+    @property
+    def building(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start_rebuild(
+        self, service: Any, concurrency: int = 4, reserve: float = 0.5
+    ) -> asyncio.Task:
+        if not self.building:
+            self.task = asyncio.create_task(self.rebuild(service, concurrency, reserve))
+        return self.task
+
+    async def rebuild(self, service: Any, concurrency: int = 4, reserve: float = 0.5):
+        """Index the addresses of every wallet, as background work."""
+        started_at = time.monotonic()
+        slots = asyncio.Semaphore(concurrency)
+        wallets = 0
+        self.error = None
+
+        async def index_wallet(wallet_id: str):
+            after = None
+            while True:
+                async with slots:
+                    page = await service.list_wallet_addresses(
+                        wallet_id, limit=PAGE_SIZE, after=after
+                    )
+                self.add_addresses(wallet_id, page.data)
+                after = page.pagination.after if page.pagination else None
+                if not after or not page.data:
+                    return
+
+        try:
+            with background_priority(reserve):
+                after = None
+                while True:
+                    async with slots:
+                        page = await service.list_wallets(limit=PAGE_SIZE, after=after)
+                    wallet_ids = [
+                        CompactWallet.from_sdk(wallet).wallet_id
+                        for wallet in page.data or []
+                    ]
+                    await asyncio.gather(
+                        *(index_wallet(wallet_id) for wallet_id in wallet_ids)
+                    )
+                    wallets += len(wallet_ids)
+                    after = page.pagination.after if page.pagination else None
+                    if not after or not page.data:
+                        break
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Address index rebuild failed after {wallets} wallets: {e}")
+            raise
+        self.wallets_indexed = wallets
+        self.build_seconds = round(time.monotonic() - started_at, 3)
+        self.built_at = time.time()
+        self.ready = True
+        logger.info(
+            f"Address index built: {len(self)} addresses in {wallets} wallets "
+            f"in {self.build_seconds}s"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "building": self.building,
+            "addresses": len(self),
+            "chains": len(self._chains),
+            "wallets_indexed": self.wallets_indexed,
+            "built_at": self.built_at,
+            "build_seconds": self.build_seconds,
+            "error": self.error,
+        }
+
+
+def lookup_many(
+    index: AddressIndex, queries: List[Tuple[str, Optional[str], Optional[str]]]
+) -> List[Dict[str, Optional[str]]]:
+    """Resolve ``(address, chain_id, memo)`` queries in one pass."""
+    results = []
+    for address, chain_id, memo in queries:
+        match = index.lookup(address, chain_id, memo)
+        results.append(
+            {
+                "address": address,
+                "chain_id": match[0] if match else chain_id,
+                "memo": memo,
+                "wallet_id": match[1] if match else None,
+            }
+        )
+    return results
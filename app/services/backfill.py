@@ -0,0 +1,261 @@
+"""Historical transaction backfill.
+
+Splits the history into created-timestamp windows, pages through the windows
+concurrently and writes the transactions to the local store in batches. Each
+batch is committed together with the window's cursor, so an interrupted job
+resumes where it stopped.
+
+Usage: python -m app.services.backfill --start 2024-01-01 [--end ...]
+       [--window 86400] [--concurrency 4] [--db transactions.db] [--tenant ID]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.compact import CompactTransaction
+from app.services.circuit_breaker import is_upstream_failure
+from app.services.rate_limiter import background_priority
+from app.services.transaction_store import TransactionStore
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+
+
+class TransactionBackfill:
+    def __init__(
+        self,
+        service: Any,
+        store: TransactionStore,
+        start_timestamp: int,
+        end_timestamp: int,
+        window: float = 86400,
+        concurrency: int = 4,
+        batch_size: int = 500,
+        max_retries: int = 5,
+        reserve: float = 0.5,
+    ):
+        # Timestamps are in milliseconds, like Cobo's created_timestamp
+        self.service = service
+        self.store = store
+        self.start_timestamp = start_timestamp
+        self.end_timestamp = end_timestamp
+        self.window_ms = max(int(window * 1000), 1)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        # Share of the rate-limit budget left to interactive requests
+        self.reserve = reserve
+        # Windows are aligned to multiples of the window size, so a later run
+        # over a longer range resumes the windows it shares with this one
+        self.job = f"{service.namespace}:{self.window_ms}"
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.windows_total = 0
+        self.windows_done = 0
+        self.rows = 0
+        self._windows_resumed = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._next_log = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def windows(self) -> List[Tuple[int, int]]:
+        first = self.start_timestamp // self.window_ms * self.window_ms
+        return [
+            (
+                max(boundary, self.start_timestamp),
+                min(boundary + self.window_ms, self.end_timestamp),
+            )
+            for boundary in range(first, self.end_timestamp, self.window_ms)
+        ]
+
+    def start(self) -> asyncio.Task:
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    async def run(self):
+        # Workers inherit the priority, their calls wait behind live traffic
+        with background_priority(self.reserve):
+            await self._run()
+
+    async def _run(self):
+        planned = self.windows()
+        starts = {start for start, _ in planned}
+        # The job may also hold windows of earlier runs over other ranges
+        windows = [
+            window
+            for window in self.store.plan_windows(self.job, planned)
+            if window[0] in starts
+        ]
+        pending = [window for window in windows if not window[4]]
+        self.windows_total = len(windows)
+        self.windows_done = self._windows_resumed = len(windows) - len(pending)
+        self.state = "running"
+        self._started_at = time.monotonic()
+        logger.info(
+            f"Backfill {self.job}: {len(pending)} of {len(windows)} windows to fetch"
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+        for window in pending:
+            queue.put_nowait(window)
+        workers = [
+            asyncio.create_task(self._worker(queue))
+            for _ in range(min(self.concurrency, len(pending)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except Exception as e:
+            for worker in workers:
+                worker.cancel()
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Backfill {self.job} failed, rerun to resume: {e}")
+        else:
+            self.state = "completed"
+            logger.info(f"Backfill {self.job} completed: {self.status()}")
+        finally:
+            self._finished_at = time.monotonic()
+            # Finished jobs are kept for their status, not the tenant's service
+            self.service = None
+
+    async def _worker(self, queue: asyncio.Queue):
+        while not queue.empty():
+            start, end, cursor, rows, _ = queue.get_nowait()
+            await self._backfill_window(start, end, cursor, rows)
+
+    async def _backfill_window(
+        self, start: int, end: int, cursor: Optional[str], rows: int
+    ):
+        namespace = self.service.namespace
+        batch: List[CompactTransaction] = []
+        while True:
+            page = await self._fetch_page(start, end, cursor)
+            for transaction in page.data or []:
+                batch.append(
+                    CompactTransaction.from_sdk(
+                        transaction, self.service.token_decimals(transaction.token_id)
+                    )
+                )
+            cursor = page.pagination.after if page.pagination else None
+            done = not cursor or not page.data
+            if len(batch) >= self.batch_size or done:
+                rows += len(batch)
+                self.store.upsert_many(
+                    namespace, batch, checkpoint=(self.job, start, cursor, rows, done)
+                )
+                self.rows += len(batch)
+                batch = []
+            if done:
+                self.windows_done += 1
+                self._log_progress()
+                return
+
+    async def _fetch_page(self, start: int, end: int, cursor: Optional[str]):
+        attempt = 0
+        while True:
+            try:
+                # Windows are half-open, the upstream bounds are inclusive
+                return await self.service.list_transactions(
+                    min_created_timestamp=start,
+                    max_created_timestamp=end - 1,
+                    limit=PAGE_SIZE,
+                    after=cursor,
+                )
+            except Exception as e:
+                attempt += 1
+                if not is_upstream_failure(e) or attempt >= self.max_retries:
+                    raise
+                delay = 2**attempt
+                logger.warning(
+                    f"Backfill page {start}-{end} failed, retrying in {delay}s: {e}"
+                )
+                await asyncio.sleep(delay)
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = 0.0
+        if self._started_at is not None:
+            elapsed = (self._finished_at or time.monotonic()) - self._started_at
+        fetched_windows = self.windows_done - self._windows_resumed
+        remaining_windows = self.windows_total - self.windows_done
+        eta = None
+        if self.running and fetched_windows:
+            eta = round(elapsed / fetched_windows * remaining_windows, 1)
+        return {
+            "job": self.job,
+            "state": self.state,
+            "windows_total": self.windows_total,
+            "windows_done": self.windows_done,
+            "rows": self.rows,
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else 0.0,
+            "eta_seconds": eta,
+            "error": self.error,
+        }
+
+    def _log_progress(self):
+        now = time.monotonic()
+        if now < self._next_log:
+            return
+        self._next_log = now + 5
+        status = self.status()
+        logger.info(
+            f"Backfill {self.job}: {status['windows_done']}/{status['windows_total']} "
+            f"windows, {status['rows']} rows, {status['rows_per_second']} rows/s, "
+            f"ETA {status['eta_seconds']}s"
+        )
+
+
+def parse_timestamp(value: str) -> int:
+    """Parse milliseconds since the epoch or an ISO 8601 date (UTC if naive)."""
+    if value.isdigit():
+        return int(value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def main():
+    from app.api.dependencies import cobo_service, registry
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", required=True, type=parse_timestamp)
+    parser.add_argument("--end", type=parse_timestamp, default=int(time.time() * 1000))
+    parser.add_argument("--window", type=float, default=86400, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--db",
+        default=settings.TRANSACTION_DB
+        if settings.TRANSACTION_DB != ":memory:"
+        else "transactions.db",
+    )
+    parser.add_argument("--tenant", help="tenant ID from COBO_TENANTS_FILE")
+    args = parser.parse_args()
+
+    service = registry.get(args.tenant) if args.tenant else cobo_service
+    backfill = TransactionBackfill(
+        service,
+        TransactionStore(args.db),
+        args.start,
+        args.end,
+        window=args.window,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        reserve=settings.BACKFILL_RATE_RESERVE,
+    )
+    asyncio.run(backfill.run())
+    print(backfill.status())
+    raise SystemExit(0 if backfill.state == "completed" else 1)
+
+
+if __name__ == "__main__":
+    main()
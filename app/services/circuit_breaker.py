@@ -0,0 +1,51 @@
+import time
+from typing import Optional
+
+import urllib3
+from cobo_waas2.exceptions import ApiException
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Return True if the exception means Cobo itself is unreachable or failing.
+
+    Client errors (4xx) prove the upstream is answering, so they do not count.
+    """
+    if isinstance(exc, ApiException):
+        return not exc.status or exc.status >= 500
+    return isinstance(exc, (urllib3.exceptions.HTTPError, OSError))
+
+
+class CircuitBreaker:
+    """Tracks consecutive upstream failures.
+
+    The circuit opens after ``failure_threshold`` consecutive failures and moves
+    to half-open once ``reset_timeout`` seconds have passed, so that the next
+    call can probe whether the upstream has recovered.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
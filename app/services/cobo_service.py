@@ -1,9 +1,25 @@
+import asyncio
+import time
 import cobo_waas2
 from cobo_waas2.api import WalletsApi, TransactionsApi
 from cobo_waas2.models import WalletType, WalletSubtype
 from cobo_waas2.exceptions import ApiException
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Set
+from app.config import settings
+from app.services.address_index import AddressIndex
+from app.models.transaction import (
+    TransferTransactionRequest,
+    ContractCallTransactionRequest,
+    MessageSignTransactionRequest,
+    new_request_id,
+)
+from app.services.circuit_breaker import CircuitBreaker, OPEN, is_upstream_failure
+from app.services.profiling import RequestProfile, current_profile
+from app.services.rate_limiter import TokenBucket, background_reserve
+from app.services.signing import SigningApiClient
+from app.services.transaction_watcher import TransactionWatcher
+from app.services.webhook_verifier import WebhookVerifier
 
 logger = logging.getLogger(__name__)
 
@@ -12,17 +28,26 @@ class CoboService:
     _instance = None
 
     @classmethod
-    def get_instance(cls, api_private_key: str, env: str):
+    def get_instance(
+        cls, api_private_key: str, env: str, webhook_public_key: Optional[str] = None
+    ):
         if cls._instance is None:
-            cls._instance = cls(api_private_key, env)
-        return cls._instance
-
-    def __init__(self, api_private_key: str, env: str):
-        if CoboService._instance is not None:
-            raise Exception(
-                "This class is a singleton. Use get_instance() to get the instance."
+            cls._instance = cls(
+                api_private_key, env, webhook_public_key=webhook_public_key
             )
+        return cls._instance
 
+    def __init__(
+        self,
+        api_private_key: str,
+        env: str,
+        rate_limit: Optional[float] = None,
+        namespace: str = "default",
+        webhook_public_key: Optional[str] = None,
+        address_index: Optional[AddressIndex] = None,
+    ):
+        # Instances for other tenants are created through CoboServiceRegistry
+        self.namespace = namespace
         self.configuration = cobo_waas2.Configuration(
             api_private_key=api_private_key,
             host="https://api.sandbox.cobo.com/v2"
@@ -31,10 +56,135 @@ class CoboService:
             if env == "development"
             else "https://api.cobo.com/v2",
         )
+        # A single ApiClient keeps one urllib3 pool, so TLS connections opened
+        # during warm-up are reused by every later call.
+        self.api_client = SigningApiClient(self.configuration)
+        self.circuit = CircuitBreaker(
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+        )
+        self.rate_limiter = TokenBucket(
+            settings.RATE_LIMIT_PER_SECOND if rate_limit is None else rate_limit
+        )
+        self.webhook_verifier = (
+            WebhookVerifier(webhook_public_key, tolerance=settings.WEBHOOK_TOLERANCE)
+            if webhook_public_key
+            else None
+        )
+        self.warmed_up = False
+        self.supported_chains: Dict[str, Any] = {}
+        self.supported_tokens: Dict[str, Any] = {}
+        self.transaction_watcher = TransactionWatcher(
+            self.get_transaction_by_id,
+            min_interval=settings.TRANSACTION_POLL_MIN_INTERVAL,
+            max_interval=settings.TRANSACTION_POLL_MAX_INTERVAL,
+        )
+        # Filled by AddressIndex.rebuild() and by the addresses created here.
+        # The registry passes in the tenant's index, which outlives eviction.
+        self.address_index = AddressIndex() if address_index is None else address_index
+        # Backfills and index rebuilds running on this service; like watched
+        # transactions, they keep the registry from evicting it
+        self.background_tasks: Set[asyncio.Task] = set()
         print(
             f"env={env}, Connecting to Cobo WaaS service at host: {self.configuration.host}"
         )
-        CoboService._instance = self
+
+    def close(self):
+        self.api_client.rest_client.pool_manager.clear()
+
+    def track_background(self, task: asyncio.Task) -> asyncio.Task:
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    @property
+    def busy(self) -> bool:
+        # Watched transactions count too: webhooks and the shared poller must
+        # reach the watcher their clients are subscribed to
+        return bool(self.background_tasks) or self.transaction_watcher.watching
+
+    async def _call(self, api_method: Callable[..., Any], *args, **kwargs):
+        profile = current_profile.get()
+        reserve = background_reserve.get()
+        if profile is not None:
+            submitted_at = time.perf_counter()
+        # Background work waits as long as needed, behind interactive requests
+        await self.rate_limiter.acquire(
+            timeout=settings.RATE_LIMIT_MAX_WAIT if reserve is None else None,
+            reserve=reserve or 0.0,
+        )
+        if profile is not None:
+            profile.add("rate_limit_wait", time.perf_counter() - submitted_at)
+            api_method = self._profiled(profile, api_method)
+        # SDK calls are blocking, run them off the event loop
+        try:
+            api_response = await asyncio.to_thread(api_method, *args, **kwargs)
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.circuit.record_failure()
+            else:
+                self.circuit.record_success()
+            raise
+        self.circuit.record_success()
+        return api_response
+
+    @staticmethod
+    def _profiled(profile: RequestProfile, api_method: Callable[..., Any]):
+        submitted_at = time.perf_counter()
+
+        def call(*args, **kwargs):
+            # Runs in the executor thread, which only serves this call
+            started_at, cpu = time.perf_counter(), time.thread_time()
+            profile.add("executor_wait", started_at - submitted_at)
+            try:
+                return api_method(*args, **kwargs)
+            finally:
+                profile.add(
+                    "upstream_call",
+                    time.perf_counter() - started_at,
+                    time.thread_time() - cpu,
+                )
+
+        return call
+
+    async def _list_all(self, api_method: Callable[..., Any], **kwargs) -> List[Any]:
+        items = []
+        after = None
+        while True:
+            page = await self._call(api_method, limit=50, after=after, **kwargs)
+            items.extend(page.data or [])
+            after = page.pagination.after if page.pagination else None
+            if not after:
+                return items
+
+    async def warm_up(self):
+        """Open pooled upstream connections and preload the chain/token catalog."""
+        api_instance = WalletsApi(self.api_client)
+        logger.info("Warming up Cobo WaaS connections")
+        await asyncio.gather(
+            *(
+                self._call(api_instance.list_supported_chains, limit=1)
+                for _ in range(settings.WARMUP_CONNECTIONS)
+            )
+        )
+        chains, tokens = await asyncio.gather(
+            self._list_all(api_instance.list_supported_chains),
+            self._list_all(api_instance.list_supported_tokens),
+        )
+        self.supported_chains = {chain.chain_id: chain for chain in chains}
+        self.supported_tokens = {token.token_id: token for token in tokens}
+        self.warmed_up = True
+        logger.info(
+            f"Warm-up complete: {len(self.supported_chains)} chains, "
+            f"{len(self.supported_tokens)} tokens"
+        )
+
+    def is_ready(self) -> bool:
+        return self.warmed_up and self.circuit.state != OPEN
+
+    def token_decimals(self, token_id: Optional[str]) -> Optional[int]:
+        token = self.supported_tokens.get(token_id)
+        return token.decimal if token is not None else None
 
     async def list_wallets(
         self,
@@ -46,23 +196,23 @@ class CoboService:
         before: Optional[str] = None,
         after: Optional[str] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info("Calling WalletsApi->list_wallets")
-                api_response = api_instance.list_wallets(
-                    wallet_type=wallet_type,
-                    wallet_subtype=wallet_subtype,
-                    project_id=project_id,
-                    vault_id=vault_id,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(f"Exception when calling WalletsApi->list_wallets: {e}\n")
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info("Calling WalletsApi->list_wallets")
+            api_response = await self._call(
+                api_instance.list_wallets,
+                wallet_type=wallet_type,
+                wallet_subtype=wallet_subtype,
+                project_id=project_id,
+                vault_id=vault_id,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(f"Exception when calling WalletsApi->list_wallets: {e}\n")
+            raise
 
     async def get_wallet_balance(
         self,
@@ -72,25 +222,25 @@ class CoboService:
         before: Optional[str] = None,
         after: Optional[str] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling WalletsApi->list_token_balances_for_wallet for wallet_id: {wallet_id}"
-                )
-                api_response = api_instance.list_token_balances_for_wallet(
-                    wallet_id,
-                    token_ids=token_ids,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->list_token_balances_for_wallet: {e}\n"
-                )
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling WalletsApi->list_token_balances_for_wallet for wallet_id: {wallet_id}"
+            )
+            api_response = await self._call(
+                api_instance.list_token_balances_for_wallet,
+                wallet_id,
+                token_ids=token_ids,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling WalletsApi->list_token_balances_for_wallet: {e}\n"
+            )
+            raise
 
     async def get_wallet_transactions(
         self,
@@ -105,46 +255,44 @@ class CoboService:
         before: Optional[str] = None,
         after: Optional[str] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling TransactionsApi->list_transactions for wallet_id: {wallet_id}"
-                )
-                api_response = api_instance.list_transactions(
-                    wallet_ids=wallet_id,
-                    types=types,
-                    statuses=statuses,
-                    chain_ids=chain_ids,
-                    token_ids=token_ids,
-                    min_created_timestamp=min_created_timestamp,
-                    max_created_timestamp=max_created_timestamp,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->list_transactions: {e}\n"
-                )
-                raise
+        api_instance = TransactionsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling TransactionsApi->list_transactions for wallet_id: {wallet_id}"
+            )
+            api_response = await self._call(
+                api_instance.list_transactions,
+                wallet_ids=wallet_id,
+                types=types,
+                statuses=statuses,
+                chain_ids=chain_ids,
+                token_ids=token_ids,
+                min_created_timestamp=min_created_timestamp,
+                max_created_timestamp=max_created_timestamp,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling TransactionsApi->list_transactions: {e}\n"
+            )
+            raise
 
     async def deposit_to_wallet(self, wallet_id: str, amount: float, token: str):
         # Note: Deposits are typically handled by generating an address and waiting for incoming transactions
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling WalletsApi->create_address for wallet_id: {wallet_id}"
-                )
-                api_response = api_instance.create_address(wallet_id)
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->create_address: {e}\n"
-                )
-                return None
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling WalletsApi->create_address for wallet_id: {wallet_id}"
+            )
+            api_response = await self._call(api_instance.create_address, wallet_id)
+            self.address_index.add_addresses(wallet_id, api_response)
+            return api_response
+        except ApiException as e:
+            logger.error(f"Exception when calling WalletsApi->create_address: {e}\n")
+            return None
 
     async def withdraw_from_wallet(
         self,
@@ -158,31 +306,26 @@ class CoboService:
         fee_token: Optional[str] = None,
         force_external: Optional[bool] = None,
         force_internal: Optional[bool] = None,
+        wallet_subtype: Optional[WalletSubtype] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                request_body = {
-                    "wallet_id": wallet_id,
-                    "token_id": token,
-                    "amount": str(amount),
-                    "to_address": address,
-                    "request_id": request_id,
-                    "memo": memo,
-                    "fee_amount": str(fee_amount) if fee_amount is not None else None,
-                    "fee_token": fee_token,
-                    "force_external": force_external,
-                    "force_internal": force_internal,
-                }
-                logger.info("Calling TransactionsApi->create_transfer_transaction")
-                logger.info(f"Request body: {request_body}")
-                api_response = api_instance.create_transfer_transaction(request_body)
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->create_transfer_transaction: {e}\n"
-                )
-                raise
+        # Same request body as POST /transactions/transfer, which defaults to an
+        # Org-Controlled source wallet
+        subtype = {"source_wallet_subtype": wallet_subtype} if wallet_subtype else {}
+        transfer = TransferTransactionRequest(
+            request_id=request_id or new_request_id(),
+            source_wallet_id=wallet_id,
+            **subtype,
+            destination_address=address,
+            token_id=token,
+            amount=str(amount),
+            max_fee=str(fee_amount) if fee_amount is not None else None,
+            fee_token_id=fee_token,
+            memo=memo,
+            force_external=force_external,
+            force_internal=force_internal,
+        )
+        logger.info(f"Withdrawing {amount} {token} from wallet {wallet_id}")
+        return await self.create_transfer_transaction(transfer)
 
     async def handle_webhook(self, payload: dict):
         # Implement webhook handling logic based on the payload
@@ -197,6 +340,13 @@ class CoboService:
             pass
         # Add more event types as needed
 
+        # Transaction events carry the full transaction in "data"
+        data = payload.get("data") or {}
+        if isinstance(data, dict) and data.get("transaction_id"):
+            self.transaction_watcher.publish_webhook(
+                data["transaction_id"], data.get("status"), data
+            )
+
     async def create_new_address(
         self,
         wallet_id: str,
@@ -204,67 +354,64 @@ class CoboService:
         count: int = 1,
         encoding: Optional[str] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling WalletsApi->create_address for wallet_id: {wallet_id}"
-                )
-                request_body = {
-                    "chain_id": chain_id,
-                    "count": count,
-                    "encoding": encoding,
-                }
-                api_response = api_instance.create_address(wallet_id, request_body)
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->create_address: {e}\n"
-                )
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling WalletsApi->create_address for wallet_id: {wallet_id}"
+            )
+            request_body = {
+                "chain_id": chain_id,
+                "count": count,
+                "encoding": encoding,
+            }
+            api_response = await self._call(
+                api_instance.create_address, wallet_id, request_body
+            )
+            self.address_index.add_addresses(wallet_id, api_response)
+            return api_response
+        except ApiException as e:
+            logger.error(f"Exception when calling WalletsApi->create_address: {e}\n")
+            raise
 
     async def list_wallet_addresses(
         self,
         wallet_id: str,
-        chain_ids: Optional[str],
-        addresses: Optional[str],
-        limit: int,
-        before: Optional[str],
-        after: Optional[str],
+        chain_ids: Optional[str] = None,
+        addresses: Optional[str] = None,
+        limit: int = 10,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling WalletsApi->list_addresses for wallet_id: {wallet_id}"
-                )
-                api_response = api_instance.list_addresses(
-                    wallet_id,
-                    chain_ids=chain_ids,
-                    addresses=addresses,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->list_addresses: {e}\n"
-                )
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling WalletsApi->list_addresses for wallet_id: {wallet_id}"
+            )
+            api_response = await self._call(
+                api_instance.list_addresses,
+                wallet_id,
+                chain_ids=chain_ids,
+                addresses=addresses,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(f"Exception when calling WalletsApi->list_addresses: {e}\n")
+            raise
 
     async def get_wallet_by_id(self, wallet_id: str):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling WalletsApi->get_wallet_by_id for wallet_id: {wallet_id}"
-                )
-                api_response = api_instance.get_wallet_by_id(wallet_id)
-                return api_response
-            except ApiException as e:
-                logger.error(f"Exception when calling WalletsApi->get_wallet: {e}\n")
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling WalletsApi->get_wallet_by_id for wallet_id: {wallet_id}"
+            )
+            api_response = await self._call(api_instance.get_wallet_by_id, wallet_id)
+            return api_response
+        except ApiException as e:
+            logger.error(f"Exception when calling WalletsApi->get_wallet: {e}\n")
+            raise
 
     async def list_supported_chains(
         self,
@@ -276,25 +423,25 @@ class CoboService:
         before: Optional[str],
         after: Optional[str],
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info("Calling WalletsApi->list_supported_chains")
-                api_response = api_instance.list_supported_chains(
-                    wallet_type=wallet_type,
-                    wallet_subtype=wallet_subtype,
-                    chain_ids=chain_ids,
-                    token_list_id=token_list_id,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->list_supported_chains: {e}\n"
-                )
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info("Calling WalletsApi->list_supported_chains")
+            api_response = await self._call(
+                api_instance.list_supported_chains,
+                wallet_type=wallet_type,
+                wallet_subtype=wallet_subtype,
+                chain_ids=chain_ids,
+                token_list_id=token_list_id,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling WalletsApi->list_supported_chains: {e}\n"
+            )
+            raise
 
     async def list_supported_tokens(
         self,
@@ -306,217 +453,150 @@ class CoboService:
         before: Optional[str],
         after: Optional[str],
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info("Calling WalletsApi->list_supported_tokens")
-                api_response = api_instance.list_supported_tokens(
-                    wallet_type=wallet_type,
-                    wallet_subtype=wallet_subtype,
-                    chain_ids=chain_ids,
-                    token_ids=token_ids,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->list_supported_tokens: {e}\n"
-                )
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info("Calling WalletsApi->list_supported_tokens")
+            api_response = await self._call(
+                api_instance.list_supported_tokens,
+                wallet_type=wallet_type,
+                wallet_subtype=wallet_subtype,
+                chain_ids=chain_ids,
+                token_ids=token_ids,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling WalletsApi->list_supported_tokens: {e}\n"
+            )
+            raise
 
     async def check_address_validity(self, chain_id: str, address: str):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = WalletsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling WalletsApi->check_address_validity for chain_id: {chain_id}, address: {address}"
-                )
-                api_response = api_instance.check_address_validity(chain_id, address)
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling WalletsApi->check_address_validity: {e}\n"
-                )
-                raise
+        api_instance = WalletsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling WalletsApi->check_address_validity for chain_id: {chain_id}, address: {address}"
+            )
+            api_response = await self._call(
+                api_instance.check_address_validity, chain_id, address
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling WalletsApi->check_address_validity: {e}\n"
+            )
+            raise
 
     async def list_transactions(
         self,
-        request_id: Optional[str],
-        cobo_ids: Optional[str],
-        transaction_ids: Optional[str],
-        transaction_hashes: Optional[str],
-        types: Optional[str],
-        statuses: Optional[str],
-        wallet_ids: Optional[str],
-        chain_ids: Optional[str],
-        token_ids: Optional[str],
-        asset_ids: Optional[str],
-        vault_id: Optional[str],
-        project_id: Optional[str],
-        min_created_timestamp: Optional[int],
-        max_created_timestamp: Optional[int],
-        limit: int,
-        before: Optional[str],
-        after: Optional[str],
+        request_id: Optional[str] = None,
+        cobo_ids: Optional[str] = None,
+        transaction_ids: Optional[str] = None,
+        transaction_hashes: Optional[str] = None,
+        types: Optional[str] = None,
+        statuses: Optional[str] = None,
+        wallet_ids: Optional[str] = None,
+        chain_ids: Optional[str] = None,
+        token_ids: Optional[str] = None,
+        asset_ids: Optional[str] = None,
+        vault_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        min_created_timestamp: Optional[int] = None,
+        max_created_timestamp: Optional[int] = None,
+        limit: int = 10,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                logger.info("Calling TransactionsApi->list_transactions")
-                api_response = api_instance.list_transactions(
-                    request_id=request_id,
-                    cobo_ids=cobo_ids,
-                    transaction_ids=transaction_ids,
-                    transaction_hashes=transaction_hashes,
-                    types=types,
-                    statuses=statuses,
-                    wallet_ids=wallet_ids,
-                    chain_ids=chain_ids,
-                    token_ids=token_ids,
-                    asset_ids=asset_ids,
-                    vault_id=vault_id,
-                    project_id=project_id,
-                    min_created_timestamp=min_created_timestamp,
-                    max_created_timestamp=max_created_timestamp,
-                    limit=limit,
-                    before=before,
-                    after=after,
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->list_transactions: {e}\n"
-                )
-                raise
+        api_instance = TransactionsApi(self.api_client)
+        try:
+            logger.info("Calling TransactionsApi->list_transactions")
+            api_response = await self._call(
+                api_instance.list_transactions,
+                request_id=request_id,
+                cobo_ids=cobo_ids,
+                transaction_ids=transaction_ids,
+                transaction_hashes=transaction_hashes,
+                types=types,
+                statuses=statuses,
+                wallet_ids=wallet_ids,
+                chain_ids=chain_ids,
+                token_ids=token_ids,
+                asset_ids=asset_ids,
+                vault_id=vault_id,
+                project_id=project_id,
+                min_created_timestamp=min_created_timestamp,
+                max_created_timestamp=max_created_timestamp,
+                limit=limit,
+                before=before,
+                after=after,
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling TransactionsApi->list_transactions: {e}\n"
+            )
+            raise
 
     async def get_transaction_by_id(self, transaction_id: str):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                logger.info(
-                    f"Calling TransactionsApi->get_transaction for transaction_id: {transaction_id}"
-                )
-                api_response = api_instance.get_transaction(transaction_id)
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->get_transaction: {e}\n"
-                )
-                raise
+        api_instance = TransactionsApi(self.api_client)
+        try:
+            logger.info(
+                f"Calling TransactionsApi->get_transaction for transaction_id: {transaction_id}"
+            )
+            api_response = await self._call(
+                api_instance.get_transaction, transaction_id
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling TransactionsApi->get_transaction: {e}\n"
+            )
+            raise
 
-    async def create_transfer_transaction(
-        self,
-        request_id: str,
-        source_wallet_id: str,
-        source_address: str,
-        destination_address: str,
-        token_id: str,
-        amount: str,
-        fee_rate: Optional[str],
-        max_fee: Optional[str],
-        utxo_outputs: Optional[List[Dict[str, Any]]],
-        memo: Optional[str],
-        note: Optional[str],
-        extra_parameters: Optional[Dict[str, Any]],
-    ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                logger.info("Calling TransactionsApi->create_transfer_transaction")
-                request_body = {
-                    "request_id": request_id,
-                    "source_wallet_id": source_wallet_id,
-                    "source_address": source_address,
-                    "destination_address": destination_address,
-                    "token_id": token_id,
-                    "amount": amount,
-                    "fee_rate": fee_rate,
-                    "max_fee": max_fee,
-                    "utxo_outputs": utxo_outputs,
-                    "memo": memo,
-                    "note": note,
-                    "extra_parameters": extra_parameters,
-                }
-                api_response = api_instance.create_transfer_transaction(request_body)
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->create_transfer_transaction: {e}\n"
-                )
-                raise
+    async def create_transfer_transaction(self, transfer: TransferTransactionRequest):
+        api_instance = TransactionsApi(self.api_client)
+        try:
+            logger.info("Calling TransactionsApi->create_transfer_transaction")
+            api_response = await self._call(
+                api_instance.create_transfer_transaction, transfer.to_sdk()
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling TransactionsApi->create_transfer_transaction: {e}\n"
+            )
+            raise
 
     async def create_contract_call_transaction(
-        self,
-        request_id: str,
-        source_wallet_id: str,
-        source_address: str,
-        destination_address: str,
-        token_id: str,
-        amount: str,
-        calldata: str,
-        fee_rate: Optional[str],
-        max_fee: Optional[str],
-        gas_limit: Optional[int],
-        note: Optional[str],
-        extra_parameters: Optional[Dict[str, Any]],
+        self, contract_call: ContractCallTransactionRequest
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                logger.info("Calling TransactionsApi->create_contract_call_transaction")
-                request_body = {
-                    "request_id": request_id,
-                    "source_wallet_id": source_wallet_id,
-                    "source_address": source_address,
-                    "destination_address": destination_address,
-                    "token_id": token_id,
-                    "amount": amount,
-                    "calldata": calldata,
-                    "fee_rate": fee_rate,
-                    "max_fee": max_fee,
-                    "gas_limit": gas_limit,
-                    "note": note,
-                    "extra_parameters": extra_parameters,
-                }
-                api_response = api_instance.create_contract_call_transaction(
-                    request_body
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->create_contract_call_transaction: {e}\n"
-                )
-                raise
+        api_instance = TransactionsApi(self.api_client)
+        try:
+            logger.info("Calling TransactionsApi->create_contract_call_transaction")
+            api_response = await self._call(
+                api_instance.create_contract_call_transaction, contract_call.to_sdk()
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling TransactionsApi->create_contract_call_transaction: {e}\n"
+            )
+            raise
 
     async def create_message_sign_transaction(
-        self,
-        request_id: str,
-        source_wallet_id: str,
-        source_address: str,
-        message: str,
-        note: Optional[str],
-        extra_parameters: Optional[Dict[str, Any]],
+        self, message_sign: MessageSignTransactionRequest
     ):
-        with cobo_waas2.ApiClient(self.configuration) as api_client:
-            api_instance = TransactionsApi(api_client)
-            try:
-                logger.info("Calling TransactionsApi->create_message_sign_transaction")
-                request_body = {
-                    "request_id": request_id,
-                    "source_wallet_id": source_wallet_id,
-                    "source_address": source_address,
-                    "message": message,
-                    "note": note,
-                    "extra_parameters": extra_parameters,
-                }
-                api_response = api_instance.create_message_sign_transaction(
-                    request_body
-                )
-                return api_response
-            except ApiException as e:
-                logger.error(
-                    f"Exception when calling TransactionsApi->create_message_sign_transaction: {e}\n"
-                )
-                raise
+        api_instance = TransactionsApi(self.api_client)
+        try:
+            logger.info("Calling TransactionsApi->create_message_sign_transaction")
+            api_response = await self._call(
+                api_instance.create_message_sign_transaction, message_sign.to_sdk()
+            )
+            return api_response
+        except ApiException as e:
+            logger.error(
+                f"Exception when calling TransactionsApi->create_message_sign_transaction: {e}\n"
+            )
+            raise
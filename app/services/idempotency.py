@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.responses import Response
+
+from app.services.storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Header set on responses replayed from the store instead of the upstream call
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def fingerprint(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class IdempotencyStore:
+    """Remembers the response to each write request by its request_id.
+
+    A repeated submission gets the stored response back without an upstream
+    call, and one that arrives while the first is still running waits for it
+    instead of issuing its own. Only successful responses are stored, so a
+    failed request can be retried. Entries expire after ``ttl`` seconds and are
+    kept in SQLite, so they survive restarts when ``path`` is a file.
+
+    Each entry also records a fingerprint of the request parameters; reusing
+    a request_id for a different request raises IdempotencyConflict.
+    """
+
+    def __init__(self, path: str = ":memory:", ttl: float = 86400):
+        self.ttl = ttl
+        self._db = connect_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+            "status_code INTEGER NOT NULL, body BLOB NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        self._inflight: Dict[str, Tuple[str, asyncio.Task]] = {}
+        self._next_purge = 0.0
+
+    async def run(
+        self,
+        key: str,
+        request_fingerprint: str,
+        call: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        stored = self._get(key)
+        if stored is not None:
+            stored_fingerprint, status_code, body = stored
+            self._check(key, stored_fingerprint, request_fingerprint)
+            logger.info(f"Replaying stored response for {key}")
+            return Response(
+                content=body,
+                status_code=status_code,
+                media_type="application/json",
+                headers={REPLAYED_HEADER: "true"},
+            )
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            # The call runs as its own task so that it completes, and its
+            # result is stored, even if the client that started it disconnects
+            task = asyncio.ensure_future(self._run(key, request_fingerprint, call))
+            inflight = self._inflight[key] = (request_fingerprint, task)
+        else:
+            logger.info(f"Joining in-flight request {key}")
+        inflight_fingerprint, task = inflight
+        self._check(key, inflight_fingerprint, request_fingerprint)
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        key: str,
+        request_fingerprint: str,
+        call: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        try:
+            response = await call()
+            if 200 <= response.status_code < 300:
+                self._put(key, request_fingerprint, response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _check(key: str, stored_fingerprint: str, request_fingerprint: str):
+        if stored_fingerprint != request_fingerprint:
+            raise IdempotencyConflict(
+                f"request_id {key.rsplit(':', 1)[-1]} was already used "
+                "for a different request"
+            )
+
+    def _get(self, key: str) -> Optional[Tuple[str, int, bytes]]:
+        row = self._db.execute(
+            "SELECT fingerprint, status_code, body, expires_at "
+            "FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None or row[3] < time.time():
+            return None
+        return row[0], row[1], row[2]
+
+    def _put(self, key: str, request_fingerprint: str, response: Response):
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (
+                key,
+                request_fingerprint,
+                response.status_code,
+                bytes(response.body),
+                now + self.ttl,
+            ),
+        )
+        if now >= self._next_purge:
+            self.purge_expired(now)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        self._next_purge = now + min(self.ttl, 60)
+        deleted = self._db.execute(
+            "DELETE FROM responses WHERE expires_at < ?", (now,)
+        ).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} expired idempotency entries")
+        return deleted
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# Profile of the request being handled, only set for sampled requests. Code
+# outside a sampled request pays a single ContextVar lookup per span.
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class RequestProfile:
+    """Wall and CPU time of one request, broken down into named spans.
+
+    CPU time is only measured for synchronous spans and for SDK calls in
+    executor threads, where the thread runs nothing else; time between awaits
+    on the event loop is shared between requests and reported as the wall
+    time not covered by any span.
+    """
+
+    __slots__ = ("method", "path", "status", "started_at", "wall", "spans", "done")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.status: Optional[int] = None
+        self.started_at = time.time()
+        self.wall = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+        self.done = False
+
+    def add(self, name: str, wall: float, cpu: float = 0.0):
+        # Tasks started during the request inherit its context, ignore what
+        # they do after it finished
+        if self.done:
+            return
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [wall, cpu, 1]
+        else:
+            span[0] += wall
+            span[1] += cpu
+            span[2] += 1
+
+    def finish(self, status: Optional[int]):
+        self.status = status
+        self.wall = time.perf_counter() - self.wall
+        self.done = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        spans = {
+            name: {
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "count": int(count),
+            }
+            for name, (wall, cpu, count) in self.spans.items()
+        }
+        covered = sum(wall for wall, _, _ in self.spans.values())
+        # Spans of concurrent calls overlap, so this is a lower bound
+        spans["event_loop"] = {
+            "wall_ms": round(max(self.wall - covered, 0.0) * 1000, 3),
+            "cpu_ms": None,
+            "count": None,
+        }
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(sum(cpu for _, cpu, _ in self.spans.values()) * 1000, 3),
+            "spans": spans,
+        }
+
+
+class span:
+    """Time a synchronous block, wall and CPU, for the sampled request.
+
+    A class rather than a generator so that the unsampled path stays at a
+    ContextVar lookup.
+    """
+
+    __slots__ = ("name", "profile", "wall", "cpu")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = current_profile.get()
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.wall, self.cpu = time.perf_counter(), time.thread_time()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile is not None:
+            self.profile.add(
+                self.name,
+                time.perf_counter() - self.wall,
+                time.thread_time() - self.cpu,
+            )
+
+
+class SlowRequestLog:
+    """Keeps the ``size`` slowest profiled requests."""
+
+    def __init__(self, size: int = 50):
+        self.size = size
+        self._heap: List[Any] = []
+        self._counter = itertools.count()
+        self.recorded = 0
+
+    def record(self, profile: RequestProfile):
+        self.recorded += 1
+        entry = (profile.wall, next(self._counter), profile)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, entry)
+        elif profile.wall > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def top(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        slowest = sorted(self._heap, reverse=True)[:limit]
+        return [profile.to_dict() for _, _, profile in slowest]
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_stacks(
+    duration: float, interval: float = 0.005, thread_ids: Optional[List[int]] = None
+) -> Counter:
+    """Sample the stacks of running threads for ``duration`` seconds.
+
+    Returns collapsed stacks (root first, frames joined by ``;``) with the
+    number of samples each was seen in, the input format of flame graph
+    tools. Runs in the calling thread, which is never sampled itself.
+    """
+    own_id = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or (thread_ids and thread_id not in thread_ids):
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, str(thread_id)))
+            stacks[";".join(reversed(frames))] += 1
+        time.sleep(interval)
+    return stacks
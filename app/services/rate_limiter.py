@@ -0,0 +1,81 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Fraction of a bucket's capacity that background work must leave untouched,
+# set for the current task with background_priority(); None outside of it
+background_reserve: ContextVar[Optional[float]] = ContextVar(
+    "background_reserve", default=None
+)
+
+
+@contextmanager
+def background_priority(reserve: float) -> Iterator[None]:
+    """Mark upstream calls made in this context as background work.
+
+    They wait until the bucket holds more than ``reserve`` of its capacity,
+    so interactive requests keep that share of the budget, and wait as long as
+    that takes rather than failing with RateLimitExceeded.
+    """
+    token = background_reserve.set(reserve)
+    try:
+        yield
+    finally:
+        background_reserve.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second up to ``capacity``.
+
+    A ``rate`` of 0 disables limiting. Intended to be used from the event loop
+    thread only.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def _reserved(self, tokens: float, reserve: float) -> float:
+        # Capped so that a full bucket always grants background calls, even
+        # when the capacity is too small to hold the reserve and a token
+        return min(reserve * self.capacity, max(self.capacity - tokens, 0.0))
+
+    def try_acquire(self, tokens: float = 1, reserve: float = 0) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens - tokens >= self._reserved(tokens, reserve):
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(
+        self, tokens: float = 1, timeout: Optional[float] = None, reserve: float = 0
+    ):
+        """Wait for ``tokens`` to become available.
+
+        With a ``reserve``, waits until that fraction of the capacity would
+        remain afterwards. Raises RateLimitExceeded if the tokens cannot be
+        granted within ``timeout``.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(tokens, reserve):
+            wait = (tokens + self._reserved(tokens, reserve) - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitExceeded("Upstream rate limit budget exhausted")
+            await asyncio.sleep(wait)
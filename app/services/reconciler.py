@@ -0,0 +1,310 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.models.compact import (
+    CompactBalance,
+    CompactTransaction,
+    CompactWallet,
+    format_amount,
+)
+from app.services.rate_limiter import background_priority
+from app.services.transaction_store import TransactionStore
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+HOUR_MS = 3600 * 1000
+
+
+def _digest(items) -> str:
+    return hashlib.sha256(repr(sorted(items)).encode()).hexdigest()
+
+
+class WalletReconciler:
+    """Compares the local transaction store and past balances with Cobo.
+
+    A pass walks all wallets with list_wallets, a page of 50 wallets at a
+    time. Each page costs one list_transactions call covering all 50 wallets
+    (more if they are busy), from which a digest of every wallet's recent
+    transaction set is computed. Only wallets whose digest changed since the
+    last pass are compared transaction by transaction with the local store
+    and have their balances fetched; balances of quiet wallets are fetched
+    again once ``balance_interval`` has passed. A balance that changed with no
+    transaction activity is reported as drift.
+
+    Passes run incrementally: run_once() checks up to ``batch_size`` wallets
+    and saves the list_wallets cursor, so a pass over many wallets is spread
+    over scheduled runs. Upstream calls are made as background work that
+    leaves ``reserve`` of the rate-limit budget to interactive requests.
+
+    The tenant's CoboService is passed to each run rather than kept, since
+    the registry replaces services it evicted.
+    """
+
+    def __init__(
+        self,
+        store: TransactionStore,
+        concurrency: int = 4,
+        batch_size: int = 1000,
+        lookback: float = 86400,
+        balance_interval: float = 86400,
+        reserve: float = 0.5,
+        repair: bool = False,
+        max_discrepancies: int = 1000,
+    ):
+        self.store = store
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.lookback_ms = int(lookback * 1000)
+        self.balance_interval_ms = int(balance_interval * 1000)
+        self.reserve = reserve
+        self.repair = repair
+        self.max_discrepancies = max_discrepancies
+        self.report: Optional[Dict[str, Any]] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._slots = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+
+    async def run_once(self, service: Any) -> Dict[str, Any]:
+        """Check the next ``batch_size`` wallets and return the pass report."""
+        async with self._lock:
+            with background_priority(self.reserve):
+                return await self._run(service)
+
+    async def run_forever(self, get_service: Callable[[], Any], interval: float):
+        while True:
+            try:
+                await self.run_once(get_service())
+            except Exception as e:
+                logger.warning(f"Reconciliation run failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def _run(self, service: Any) -> Dict[str, Any]:
+        namespace = service.namespace
+        cursor, pass_started_at = self.store.reconciliation_cursor(namespace)
+        if cursor is None or self.report is None:
+            # Reports are kept in memory, a pass resumed after a restart only
+            # reports what it finds from then on
+            pass_started_at = pass_started_at if cursor else _now_ms()
+            self.report = {
+                "pass_started_at": pass_started_at,
+                "completed_at": None,
+                "wallets_checked": 0,
+                "wallets_changed": 0,
+                "balance_checks": 0,
+                "discrepancy_count": 0,
+                "discrepancies": [],
+            }
+        # Aligned to the hour, so the digests of quiet wallets stay stable
+        since = (pass_started_at - self.lookback_ms) // HOUR_MS * HOUR_MS
+
+        checked = 0
+        pending: Set[asyncio.Task] = set()
+        try:
+            while checked < self.batch_size:
+                async with self._slots:
+                    page = await service.list_wallets(limit=PAGE_SIZE, after=cursor)
+                wallet_ids = [
+                    CompactWallet.from_sdk(wallet).wallet_id
+                    for wallet in page.data or []
+                ]
+                cursor = page.pagination.after if page.pagination else None
+                if wallet_ids:
+                    pending.add(
+                        asyncio.create_task(
+                            self._check_wallets(service, wallet_ids, since)
+                        )
+                    )
+                    checked += len(wallet_ids)
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                if not cursor:
+                    break
+            await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+        report = self.report
+        if cursor:
+            self.store.save_reconciliation_cursor(namespace, cursor, pass_started_at)
+        else:
+            self.store.save_reconciliation_cursor(namespace, None, None)
+            report["completed_at"] = _now_ms()
+            self.last_report, self.report = report, None
+            logger.info(
+                f"Reconciliation pass for {namespace} completed: "
+                f"{report['wallets_checked']} wallets, "
+                f"{report['wallets_changed']} changed, "
+                f"{report['discrepancy_count']} discrepancies"
+            )
+        return report
+
+    async def _check_wallets(self, service: Any, wallet_ids: List[str], since: int):
+        namespace = service.namespace
+        upstream = await self._recent_transactions(service, wallet_ids, since)
+        local = self.store.statuses_for_wallets(namespace, wallet_ids, since)
+        previous = self.store.wallet_digests(namespace, wallet_ids)
+        now = _now_ms()
+
+        digests = []
+        balance_checks = []
+        for wallet_id in wallet_ids:
+            transactions = upstream[wallet_id]
+            transaction_digest = _digest(
+                (transaction_id, transaction.status)
+                for transaction_id, transaction in transactions.items()
+            )
+            previous_digest, balance_digest, balance_checked_at = previous.get(
+                wallet_id, (None, None, None)
+            )
+            changed = transaction_digest != previous_digest
+            if changed:
+                self.report["wallets_changed"] += 1
+                if transaction_digest != _digest(local[wallet_id].items()):
+                    self._compare_transactions(
+                        namespace, wallet_id, transactions, local[wallet_id]
+                    )
+            if (
+                changed
+                or balance_checked_at is None
+                or now - balance_checked_at >= self.balance_interval_ms
+            ):
+                balance_checks.append((wallet_id, changed, balance_digest))
+            digests.append([wallet_id, transaction_digest, None, now, None])
+
+        balances = await asyncio.gather(
+            *(
+                self._balance_digest(service, wallet_id)
+                for wallet_id, _, _ in balance_checks
+            )
+        )
+        new_balances = {}
+        for (wallet_id, changed, previous_balance), balance in zip(
+            balance_checks, balances
+        ):
+            new_balances[wallet_id] = balance
+            if previous_balance is not None and balance != previous_balance:
+                if not changed:
+                    self._report(
+                        wallet_id, "balance_changed_without_transactions", None
+                    )
+        for row in digests:
+            if row[0] in new_balances:
+                row[2], row[4] = new_balances[row[0]], now
+        self.store.save_wallet_digests(namespace, [tuple(row) for row in digests])
+        self.report["wallets_checked"] += len(wallet_ids)
+        self.report["balance_checks"] += len(balance_checks)
+
+    def _compare_transactions(
+        self,
+        namespace: str,
+        wallet_id: str,
+        upstream: Dict[str, CompactTransaction],
+        local: Dict[str, str],
+    ):
+        stale = []
+        for transaction_id, transaction in upstream.items():
+            local_status = local.get(transaction_id)
+            if transaction_id not in local:
+                self._report(wallet_id, "missing_locally", transaction_id)
+            elif local_status != transaction.status:
+                self._report(
+                    wallet_id,
+                    "status_mismatch",
+                    transaction_id,
+                    local=local_status,
+                    upstream=transaction.status,
+                )
+            else:
+                continue
+            stale.append(transaction)
+        for transaction_id in local.keys() - upstream.keys():
+            self._report(wallet_id, "missing_upstream", transaction_id)
+        if self.repair and stale:
+            self.store.upsert_many(namespace, stale)
+
+    def _report(
+        self, wallet_id: str, kind: str, transaction_id: Optional[str], **details
+    ):
+        self.report["discrepancy_count"] += 1
+        logger.warning(
+            f"Reconciliation discrepancy in wallet {wallet_id}: {kind} "
+            f"{transaction_id or ''} {details or ''}"
+        )
+        if len(self.report["discrepancies"]) < self.max_discrepancies:
+            self.report["discrepancies"].append(
+                {
+                    "wallet_id": wallet_id,
+                    "kind": kind,
+                    "transaction_id": transaction_id,
+                    **details,
+                }
+            )
+
+    async def _recent_transactions(
+        self, service: Any, wallet_ids: List[str], since: int
+    ) -> Dict[str, Dict[str, CompactTransaction]]:
+        result: Dict[str, Dict[str, CompactTransaction]] = {
+            wallet_id: {} for wallet_id in wallet_ids
+        }
+        after = None
+        while True:
+            async with self._slots:
+                page = await service.list_transactions(
+                    wallet_ids=",".join(wallet_ids),
+                    min_created_timestamp=since,
+                    limit=PAGE_SIZE,
+                    after=after,
+                )
+            for transaction in page.data or []:
+                if transaction.wallet_id in result:
+                    result[transaction.wallet_id][
+                        transaction.transaction_id
+                    ] = CompactTransaction.from_sdk(
+                        transaction, service.token_decimals(transaction.token_id)
+                    )
+            after = page.pagination.after if page.pagination else None
+            if not after or not page.data:
+                return result
+
+    async def _balance_digest(self, service: Any, wallet_id: str) -> str:
+        balances = []
+        after = None
+        while True:
+            async with self._slots:
+                page = await service.get_wallet_balance(
+                    wallet_id, limit=PAGE_SIZE, after=after
+                )
+            for token_balance in page.data or []:
+                balance = CompactBalance.from_sdk(wallet_id, token_balance)
+                # Normalized, so "1.0" and "1.00" digest the same
+                balances.append(
+                    (
+                        balance.token_id,
+                        *(
+                            str(format_amount(amount, balance.decimals).normalize())
+                            for amount in (
+                                balance.total,
+                                balance.available,
+                                balance.pending,
+                                balance.locked,
+                            )
+                        ),
+                    )
+                )
+            after = page.pagination.after if page.pagination else None
+            if not after or not page.data:
+                return _digest(balances)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.services.address_index import AddressIndex
+from app.services.cobo_service import CoboService
+
+logger = logging.getLogger(__name__)
+
+
+def load_tenants(path: Optional[str]) -> Dict[str, dict]:
+    """Load tenant credentials from a JSON file.
+
+    The file maps tenant IDs to ``{"api_secret": ..., "env": ..., "rate_limit": ...,
+    "webhook_public_key": ...}``.
+    """
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class CoboServiceRegistry:
+    """Holds one CoboService per tenant, keyed by API key and environment.
+
+    Each service has its own connection pool, rate-limit budget and cache
+    namespace. Services are created on first use and the least recently used
+    ones are closed once the registry is full or they have been idle too long.
+    The default service is never evicted, nor are services running background
+    work or watching transactions, so the registry may briefly hold more than
+    ``max_tenants``.
+    """
+
+    def __init__(
+        self,
+        default_service: CoboService,
+        tenants: Dict[str, dict],
+        max_tenants: int = 32,
+        idle_timeout: float = 600,
+        address_indexes: Optional[Dict[str, AddressIndex]] = None,
+    ):
+        self.default_service = default_service
+        # Address indexes by namespace, kept when services are evicted
+        self.address_indexes = {} if address_indexes is None else address_indexes
+        self.tenants = tenants
+        self.max_tenants = max_tenants
+        self.idle_timeout = idle_timeout
+        self._services: "OrderedDict[Tuple[str, str], Tuple[CoboService, float]]" = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def tenant_key(api_secret: str, env: str) -> Tuple[str, str]:
+        # Never keep the secret itself in the key, only a fingerprint of it
+        return hashlib.sha256(api_secret.encode()).hexdigest()[:16], env
+
+    def get(self, tenant_id: str) -> CoboService:
+        tenant = self.tenants.get(tenant_id)
+        if tenant is None:
+            raise KeyError(tenant_id)
+        key = self.tenant_key(tenant["api_secret"], tenant["env"])
+        now = time.monotonic()
+        self._evict_idle(now)
+        if key in self._services:
+            service, _ = self._services.pop(key)
+        else:
+            logger.info(f"Creating CoboService for tenant {tenant_id}")
+            namespace = ":".join(key)
+            service = CoboService(
+                tenant["api_secret"],
+                tenant["env"],
+                rate_limit=tenant.get("rate_limit"),
+                namespace=namespace,
+                webhook_public_key=tenant.get("webhook_public_key"),
+                address_index=self.address_indexes.setdefault(
+                    namespace, AddressIndex()
+                ),
+            )
+        self._services[key] = (service, now)
+        idle = [
+            other
+            for other, (other_service, _) in self._services.items()
+            if other != key and not other_service.busy
+        ]
+        for other in idle[: max(len(self._services) - self.max_tenants, 0)]:
+            self._evict(other)
+        return service
+
+    def _evict_idle(self, now: float):
+        for key, (service, last_used) in list(self._services.items()):
+            if now - last_used < self.idle_timeout:
+                # Entries are ordered by last use, the rest are more recent
+                break
+            if not service.busy:
+                self._evict(key)
+
+    def _evict(self, key: Tuple[str, str]):
+        service, _ = self._services.pop(key)
+        logger.info(f"Evicting CoboService for tenant key {key[0]} ({key[1]})")
+        service.close()
+
+    def __len__(self):
+        return len(self._services)
@@ -0,0 +1,79 @@
+import json
+import time
+from urllib.parse import urlparse, urlencode, urlunparse, parse_qsl
+
+import cobo_waas2
+from cobo_waas2.crypto.signing_helper import SignHelper
+from nacl.signing import SigningKey
+
+
+class CachedSigner:
+    """Ed25519 request signer that parses the API private key only once.
+
+    SignHelper rebuilds the SigningKey and derives the public key on every
+    request. Both are immutable here, and libsodium signing holds no shared
+    state, so one instance can sign from any number of executor threads.
+    """
+
+    def __init__(self, api_private_key: str):
+        self.signing_key = SigningKey(bytes.fromhex(api_private_key))
+        self.api_key = bytes(self.signing_key.verify_key).hex()
+
+    def generate_headers(
+        self, body: bytes, method: str, params: dict, path: str
+    ) -> dict:
+        timestamp = str(int(time.time() * 1000))
+        digest = SignHelper._build_unsigned_digest(
+            method, path, timestamp, params=params, body=body
+        )
+        return {
+            "Biz-Api-Key": self.api_key,
+            "Biz-Api-Nonce": timestamp,
+            "Biz-Api-Signature": self.signing_key.sign(digest).signature.hex(),
+        }
+
+
+class SigningApiClient(cobo_waas2.ApiClient):
+    """ApiClient that signs requests with a CachedSigner."""
+
+    def __init__(self, configuration: cobo_waas2.Configuration):
+        super().__init__(configuration)
+        self.signer = (
+            CachedSigner(configuration.api_private_key)
+            if configuration.api_private_key
+            else None
+        )
+
+    def call_api(
+        self,
+        method,
+        url,
+        header_params=None,
+        body=None,
+        post_params=None,
+        _request_timeout=None,
+    ):
+        if self.signer is None:
+            return super().call_api(
+                method, url, header_params, body, post_params, _request_timeout
+            )
+        # Mirrors ApiClient.call_api, only the signing step differs
+        url_parts = urlparse(url)
+        query_params = dict(parse_qsl(url_parts.query))
+        query_params = {k: v for k, v in query_params.items() if v}
+        url_parts = url_parts._replace(query=urlencode(query_params))
+        auth_headers = self.signer.generate_headers(
+            body=json.dumps(body).encode("utf-8") if body else b"",
+            method=method,
+            params=query_params,
+            path=url_parts.path,
+        )
+        header_params.update(auth_headers)
+        return self.rest_client.request(
+            method,
+            urlunparse(url_parts),
+            headers=header_params,
+            body=body,
+            post_params=post_params,
+            _request_timeout=_request_timeout,
+        )
@@ -0,0 +1,17 @@
+import sqlite3
+
+
+def connect_sqlite(path: str = ":memory:") -> sqlite3.Connection:
+    """Open a connection for one of the local SQLite stores.
+
+    Connections are in autocommit mode, statements that belong together are
+    grouped with explicit transactions. File databases use WAL, so readers do
+    not block the writer, with fsync only at checkpoints.
+    """
+    # Only ever used from the event loop, which need not be the thread that
+    # created the store
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    if path != ":memory:":
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+    return db
@@ -0,0 +1,252 @@
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.compact import CompactTransaction
+from app.services.storage import connect_sqlite
+
+COLUMNS = (
+    "transaction_id",
+    "wallet_id",
+    "type",
+    "status",
+    "chain_id",
+    "token_id",
+    "amount",
+    "transaction_hash",
+    "created_timestamp",
+    "updated_timestamp",
+)
+
+
+class TransactionStore:
+    """Local SQLite copy of transactions, one table shared by all tenants.
+
+    Rows are keyed by (namespace, transaction_id) and written in bulk; the
+    store also keeps the backfill checkpoints so that rows and the cursor
+    that produced them are committed together, and the per-wallet digests
+    of the last reconciliation.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._db = connect_sqlite(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS transactions (
+                namespace TEXT NOT NULL,
+                transaction_id TEXT NOT NULL,
+                wallet_id TEXT,
+                type TEXT,
+                status TEXT,
+                chain_id TEXT,
+                token_id TEXT,
+                -- Decimal string, amounts in minor units overflow INTEGER
+                amount TEXT,
+                transaction_hash TEXT,
+                created_timestamp INTEGER,
+                updated_timestamp INTEGER,
+                PRIMARY KEY (namespace, transaction_id)
+            );
+            CREATE INDEX IF NOT EXISTS transactions_wallet
+                ON transactions (namespace, wallet_id, created_timestamp);
+            CREATE TABLE IF NOT EXISTS backfill_windows (
+                job TEXT NOT NULL,
+                start_timestamp INTEGER NOT NULL,
+                end_timestamp INTEGER NOT NULL,
+                cursor TEXT,
+                rows INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (job, start_timestamp)
+            );
+            CREATE TABLE IF NOT EXISTS wallet_digests (
+                namespace TEXT NOT NULL,
+                wallet_id TEXT NOT NULL,
+                transaction_digest TEXT,
+                balance_digest TEXT,
+                checked_at INTEGER,
+                balance_checked_at INTEGER,
+                PRIMARY KEY (namespace, wallet_id)
+            );
+            CREATE TABLE IF NOT EXISTS reconciliation_cursors (
+                namespace TEXT PRIMARY KEY,
+                cursor TEXT,
+                pass_started_at INTEGER
+            );
+            """
+        )
+
+    def upsert_many(
+        self,
+        namespace: str,
+        transactions: Iterable[CompactTransaction],
+        checkpoint: Optional[Tuple[str, int, Optional[str], int, bool]] = None,
+    ) -> int:
+        """Write transactions in one SQLite transaction.
+
+        ``checkpoint`` is ``(job, start_timestamp, cursor, rows, done)`` for
+        the backfill window the rows came from, committed atomically with them.
+        """
+        rows = [
+            (
+                namespace,
+                t.transaction_id,
+                t.wallet_id,
+                t.type,
+                t.status,
+                t.chain_id,
+                t.token_id,
+                format(t.amount_decimal, "f"),
+                t.transaction_hash,
+                t.created_timestamp,
+                t.updated_timestamp,
+            )
+            for t in transactions
+        ]
+        with self._transaction():
+            self._db.executemany(
+                "INSERT OR REPLACE INTO transactions VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if checkpoint is not None:
+                job, start_timestamp, cursor, count, done = checkpoint
+                self._db.execute(
+                    "UPDATE backfill_windows SET cursor = ?, rows = ?, done = ? "
+                    "WHERE job = ? AND start_timestamp = ?",
+                    (cursor, count, int(done), job, start_timestamp),
+                )
+        return len(rows)
+
+    def get(self, namespace: str, transaction_id: str) -> Optional[dict]:
+        row = self._db.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM transactions "
+            "WHERE namespace = ? AND transaction_id = ?",
+            (namespace, transaction_id),
+        ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def latest_for_wallet(self, namespace: str, wallet_id: str) -> Optional[dict]:
+        row = self._db.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM transactions "
+            "WHERE namespace = ? AND wallet_id = ? "
+            "ORDER BY created_timestamp DESC LIMIT 1",
+            (namespace, wallet_id),
+        ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def statuses_for_wallets(
+        self, namespace: str, wallet_ids: List[str], since: int
+    ) -> Dict[str, Dict[str, str]]:
+        """Return ``{wallet_id: {transaction_id: status}}`` created since ``since``."""
+        result: Dict[str, Dict[str, str]] = {wallet_id: {} for wallet_id in wallet_ids}
+        placeholders = ", ".join("?" * len(wallet_ids))
+        for wallet_id, transaction_id, status in self._db.execute(
+            "SELECT wallet_id, transaction_id, status FROM transactions "
+            f"WHERE namespace = ? AND wallet_id IN ({placeholders}) "
+            "AND created_timestamp >= ?",
+            (namespace, *wallet_ids, since),
+        ):
+            result[wallet_id][transaction_id] = status
+        return result
+
+    def count(self, namespace: str) -> int:
+        return self._db.execute(
+            "SELECT COUNT(*) FROM transactions WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+
+    def plan_windows(
+        self, job: str, windows: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int, Optional[str], int, bool]]:
+        """Record a job's windows and return all of them with their progress.
+
+        Each window is ``(start_timestamp, end_timestamp, cursor, rows, done)``.
+        Planned windows keep their progress, unless they now extend further,
+        in which case they are fetched again.
+        """
+        with self._transaction():
+            self._db.executemany(
+                "INSERT INTO backfill_windows (job, start_timestamp, end_timestamp) "
+                "VALUES (?, ?, ?) ON CONFLICT (job, start_timestamp) DO UPDATE SET "
+                "end_timestamp = excluded.end_timestamp, cursor = NULL, rows = 0, "
+                "done = 0 WHERE excluded.end_timestamp > end_timestamp",
+                [(job, start, end) for start, end in windows],
+            )
+        return [
+            (start, end, cursor, rows, bool(done))
+            for start, end, cursor, rows, done in self._db.execute(
+                "SELECT start_timestamp, end_timestamp, cursor, rows, done "
+                "FROM backfill_windows WHERE job = ? ORDER BY start_timestamp",
+                (job,),
+            )
+        ]
+
+    def wallet_digests(
+        self, namespace: str, wallet_ids: List[str]
+    ) -> Dict[str, Tuple[Optional[str], Optional[str], Optional[int]]]:
+        """Return ``{wallet_id: (transaction_digest, balance_digest,
+        balance_checked_at)}`` for the wallets reconciled before."""
+        placeholders = ", ".join("?" * len(wallet_ids))
+        return {
+            wallet_id: (transaction_digest, balance_digest, balance_checked_at)
+            for wallet_id, transaction_digest, balance_digest, balance_checked_at in (
+                self._db.execute(
+                    "SELECT wallet_id, transaction_digest, balance_digest, "
+                    "balance_checked_at FROM wallet_digests "
+                    f"WHERE namespace = ? AND wallet_id IN ({placeholders})",
+                    (namespace, *wallet_ids),
+                )
+            )
+        }
+
+    def save_wallet_digests(
+        self,
+        namespace: str,
+        digests: List[Tuple[str, str, Optional[str], int, Optional[int]]],
+    ):
+        """Store ``(wallet_id, transaction_digest, balance_digest, checked_at,
+        balance_checked_at)`` rows; a None balance keeps the previous one."""
+        with self._transaction():
+            self._db.executemany(
+                "INSERT INTO wallet_digests VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, wallet_id) DO UPDATE SET "
+                "transaction_digest = excluded.transaction_digest, "
+                "balance_digest = COALESCE(excluded.balance_digest, balance_digest), "
+                "checked_at = excluded.checked_at, balance_checked_at = "
+                "COALESCE(excluded.balance_checked_at, balance_checked_at)",
+                [(namespace, *row) for row in digests],
+            )
+
+    def reconciliation_cursor(
+        self, namespace: str
+    ) -> Tuple[Optional[str], Optional[int]]:
+        row = self._db.execute(
+            "SELECT cursor, pass_started_at FROM reconciliation_cursors "
+            "WHERE namespace = ?",
+            (namespace,),
+        ).fetchone()
+        return row if row else (None, None)
+
+    def save_reconciliation_cursor(
+        self, namespace: str, cursor: Optional[str], pass_started_at: Optional[int]
+    ):
+        self._db.execute(
+            "INSERT OR REPLACE INTO reconciliation_cursors VALUES (?, ?, ?)",
+            (namespace, cursor, pass_started_at),
+        )
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def close(self):
+        self._db.close()
+
+
+class _Transaction:
+    # Connections are in autocommit mode; group statements explicitly
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.services.circuit_breaker import is_upstream_failure
+from app.services.rate_limiter import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"Completed", "Failed", "Rejected"}
+
+
+class TransactionWatchError(Exception):
+    """Polling a watched transaction failed in a way retrying will not fix.
+
+    ``status`` is the upstream HTTP status, 404 for unknown transactions, or
+    None when the response could not be used.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class WatchedTransaction:
+    def __init__(self, transaction_id: str, min_interval: float):
+        self.transaction_id = transaction_id
+        self.status: Optional[str] = None
+        self.data: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.subscribers = 0
+        self.interval = min_interval
+        self.next_poll_at = time.monotonic()
+        self.changed = asyncio.Event()
+        self.error: Optional[TransactionWatchError] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES or self.error is not None
+
+    def raise_error(self):
+        if self.error is not None:
+            raise TransactionWatchError(str(self.error), self.error.status)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "transaction_id": self.transaction_id,
+            "transaction_status": self.status,
+            "version": self.version,
+            "data": self.data,
+        }
+
+
+class TransactionWatcher:
+    """Pushes transaction status changes to any number of waiting clients.
+
+    Updates come from webhook events. A single shared poller covers watched
+    transactions that have not received webhooks: each is polled at most once
+    per interval, no matter how many clients wait on it. The interval doubles
+    while the status is unchanged and resets when it changes. Transactions
+    that do receive webhooks are only polled at ``max_interval`` as a safety
+    net.
+    """
+
+    def __init__(
+        self,
+        fetch_transaction: Callable[[str], Awaitable[Any]],
+        min_interval: float = 1,
+        max_interval: float = 30,
+    ):
+        self.fetch_transaction = fetch_transaction
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._watched: Dict[str, WatchedTransaction] = {}
+        self._wakeup = asyncio.Event()
+        self._poller: Optional[asyncio.Task] = None
+
+    @property
+    def watching(self) -> bool:
+        return bool(self._watched)
+
+    def publish(
+        self, transaction_id: str, status: Optional[str], data: Dict[str, Any]
+    ) -> bool:
+        """Record the latest state of a transaction, waking its watchers.
+
+        Returns True if the status changed.
+        """
+        watched = self._watched.get(transaction_id)
+        if watched is None:
+            return False
+        watched.data = data
+        if status == watched.status and watched.version:
+            return False
+        watched.status = status
+        watched.version += 1
+        watched.changed.set()
+        watched.changed = asyncio.Event()
+        return True
+
+    def publish_webhook(self, transaction_id: str, status: Optional[str], data):
+        watched = self._watched.get(transaction_id)
+        if watched is None:
+            return
+        self.publish(transaction_id, status, data)
+        watched.interval = self.max_interval
+        watched.next_poll_at = time.monotonic() + self.max_interval
+
+    async def wait(
+        self,
+        transaction_id: str,
+        known_status: Optional[str] = None,
+        timeout: float = 30,
+    ) -> Dict[str, Any]:
+        """Long-poll until the transaction's status differs from ``known_status``.
+
+        Returns the current snapshot when that happens or when ``timeout``
+        expires, whichever comes first. Raises TransactionWatchError if the
+        transaction cannot be fetched, e.g. because it does not exist.
+        """
+        watched = self._subscribe(transaction_id)
+        deadline = time.monotonic() + timeout
+        try:
+            while (
+                not watched.version or watched.status == known_status
+            ) and not watched.done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(watched.changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            watched.raise_error()
+            return watched.snapshot()
+        finally:
+            self._unsubscribe(watched)
+
+    async def stream(
+        self, transaction_id: str, heartbeat: float = 15
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield a snapshot on every status change until the transaction is done.
+
+        Yields None when nothing changed for ``heartbeat`` seconds. Raises
+        TransactionWatchError if the transaction cannot be fetched.
+        """
+        watched = self._subscribe(transaction_id)
+        try:
+            version = 0
+            while True:
+                watched.raise_error()
+                if watched.version > version:
+                    version = watched.version
+                    yield watched.snapshot()
+                    if watched.done:
+                        return
+                    continue
+                try:
+                    await asyncio.wait_for(watched.changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._unsubscribe(watched)
+
+    def _subscribe(self, transaction_id: str) -> WatchedTransaction:
+        watched = self._watched.get(transaction_id)
+        if watched is None:
+            watched = WatchedTransaction(transaction_id, self.min_interval)
+            self._watched[transaction_id] = watched
+            self._wakeup.set()
+        watched.subscribers += 1
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        return watched
+
+    def _unsubscribe(self, watched: WatchedTransaction):
+        watched.subscribers -= 1
+        if watched.subscribers <= 0:
+            self._watched.pop(watched.transaction_id, None)
+
+    async def _poll_loop(self):
+        while self._watched:
+            now = time.monotonic()
+            due = [
+                w
+                for w in self._watched.values()
+                if not w.done and w.next_poll_at <= now
+            ]
+            if due:
+                await asyncio.gather(*(self._poll(w) for w in due))
+                continue
+            pending = [w.next_poll_at for w in self._watched.values() if not w.done]
+            timeout = min(pending) - now if pending else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, watched: WatchedTransaction):
+        try:
+            transaction = await self.fetch_transaction(watched.transaction_id)
+            data = transaction.to_dict()
+            changed = self.publish(watched.transaction_id, data.get("status"), data)
+        except Exception as e:
+            if is_upstream_failure(e) or isinstance(e, RateLimitExceeded):
+                # Transient, keep polling with backoff
+                logger.warning(
+                    f"Polling transaction {watched.transaction_id} failed: {e}"
+                )
+                changed = False
+            else:
+                logger.warning(
+                    f"Giving up on transaction {watched.transaction_id}: {e}"
+                )
+                watched.error = TransactionWatchError(
+                    f"Transaction {watched.transaction_id} cannot be watched: {e}",
+                    getattr(e, "status", None),
+                )
+                watched.changed.set()
+                return
+        watched.interval = (
+            self.min_interval
+            if changed
+            else min(watched.interval * 2, self.max_interval)
+        )
+        watched.next_poll_at = time.monotonic() + watched.interval
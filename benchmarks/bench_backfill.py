@@ -0,0 +1,80 @@
+"""Backfill throughput against a simulated upstream.
+
+Each list_transactions page takes a fixed latency, as a round trip to Cobo
+would. Compares a sequential backfill with concurrent time windows, writing to
+a SQLite file in batches.
+
+Usage: python -m benchmarks.bench_backfill [transactions] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from app.services.backfill import TransactionBackfill
+from app.services.transaction_store import TransactionStore
+from tests.fakes import sdk_transaction
+
+SPACING_MS = 1000
+
+
+class SimulatedService:
+    namespace = "bench"
+
+    def __init__(self, count: int, latency: float):
+        self.transactions = [
+            sdk_transaction(f"tx-{i}", created_timestamp=i * SPACING_MS)
+            for i in range(count)
+        ]
+        self.latency = latency
+
+    def token_decimals(self, token_id):
+        return 18
+
+    async def list_transactions(
+        self, min_created_timestamp, max_created_timestamp, limit, after
+    ):
+        await asyncio.sleep(self.latency)
+        first = -(-min_created_timestamp // SPACING_MS)
+        last = min(max_created_timestamp // SPACING_MS, len(self.transactions) - 1)
+        offset = int(after or 0)
+        newest = last - offset
+        page = self.transactions[max(newest - limit + 1, first) : newest + 1][::-1]
+        more = newest - limit >= first
+        return SimpleNamespace(
+            data=page,
+            pagination=SimpleNamespace(after=str(offset + limit) if more else None),
+        )
+
+
+def run(count: int, latency: float, concurrency: int) -> dict:
+    service = SimulatedService(count, latency)
+    with tempfile.TemporaryDirectory() as directory:
+        store = TransactionStore(os.path.join(directory, "transactions.db"))
+        end = count * SPACING_MS
+        backfill = TransactionBackfill(
+            service, store, 0, end, window=end / 1000 / 32, concurrency=concurrency
+        )
+        start = time.perf_counter()
+        asyncio.run(backfill.run())
+        elapsed = time.perf_counter() - start
+        assert store.count("bench") == count
+        store.close()
+    return {"elapsed": elapsed, "rows_per_second": count / elapsed}
+
+
+def main(count: int = 20000, latency_ms: float = 50):
+    print(f"{count} transactions, {latency_ms}ms per page, 32 windows")
+    for concurrency in (1, 4, 8, 16):
+        result = run(count, latency_ms / 1000, concurrency)
+        print(
+            f"concurrency {concurrency:>2}: {result['elapsed']:6.2f}s, "
+            f"{result['rows_per_second']:8.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:3]
+    main(*([int(args[0])] if args else []), *(float(arg) for arg in args[1:]))
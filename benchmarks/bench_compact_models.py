@@ -0,0 +1,102 @@
+"""Memory per cached transaction for each in-memory representation.
+
+CompactTransaction is measured at the full count, built one by one from SDK
+models that are then dropped, as a cache filled from list_transactions would.
+Retaining SDK models or their to_dict() output costs several KiB per entry, so
+those are measured on a smaller sample; bytes per entry is linear in count.
+
+Usage: python -m benchmarks.bench_compact_models [count] [sample]
+"""
+import gc
+import sys
+import tracemalloc
+import uuid
+
+from cobo_waas2 import models as sdk
+
+from app.models.compact import CompactTransaction
+from app.models.wallet import Transaction
+
+WALLETS = [str(uuid.uuid4()) for _ in range(1000)]
+TOKENS = [("ETH", "ETH", 18), ("ETH", "ETH_USDT", 6), ("BTC", "BTC", 8)]
+
+
+def transaction_dict(i: int) -> dict:
+    chain_id, token_id, _ = TOKENS[i % len(TOKENS)]
+    wallet_id = WALLETS[i % len(WALLETS)]
+    return {
+        "transaction_id": str(uuid.uuid4()),
+        "wallet_id": wallet_id,
+        "type": "Withdrawal",
+        "status": "Completed",
+        "chain_id": chain_id,
+        "token_id": token_id,
+        "source": {"source_type": "Org-Controlled", "wallet_id": wallet_id},
+        "destination": {
+            "destination_type": "Address",
+            "account_output": {"address": "0xdef", "amount": f"{i % 977}.{i:06d}"},
+        },
+        "initiator_type": "API",
+        "transaction_hash": "0x" + uuid.uuid4().hex * 2,
+        "created_timestamp": 1700000000000 + i,
+        "updated_timestamp": 1700000000000 + i,
+    }
+
+
+def measure(build, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = [build(i) for i in range(count)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del entries
+    return used / count
+
+
+def compact(i: int) -> CompactTransaction:
+    decimals = TOKENS[i % len(TOKENS)][2]
+    return CompactTransaction.from_sdk(
+        sdk.Transaction.from_dict(transaction_dict(i)), decimals
+    )
+
+
+def pydantic_model(i: int) -> Transaction:
+    data = transaction_dict(i)
+    return Transaction(
+        id=data["transaction_id"],
+        type=data["type"],
+        amount=float(data["destination"]["account_output"]["amount"]),
+        token=data["token_id"],
+        timestamp=data["created_timestamp"],
+    )
+
+
+def main(count: int = 1_000_000, sample: int = 20_000):
+    results = [
+        (
+            "SDK Transaction",
+            measure(lambda i: sdk.Transaction.from_dict(transaction_dict(i)), sample),
+            sample,
+        ),
+        (
+            "SDK to_dict()",
+            measure(
+                lambda i: sdk.Transaction.from_dict(transaction_dict(i)).to_dict(),
+                sample,
+            ),
+            sample,
+        ),
+        ("app.models.wallet.Transaction", measure(pydantic_model, count), count),
+        ("CompactTransaction", measure(compact, count), count),
+    ]
+    for name, per_entry, measured in results:
+        print(
+            f"{name:30s} {per_entry:8.0f} bytes/entry "
+            f"({per_entry * 1_000_000 / 2**20:7.0f} MiB per 1M, measured at {measured})"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,108 @@
+"""Bandwidth and CPU cost of response compression levels.
+
+Compresses typical list responses, a page of 50 transactions and a catalog of
+enabled tokens, at several levels of each available encoding. Reports the
+compressed size and the time per response; brotli and zstd are included when
+their packages are installed.
+
+Usage: python -m benchmarks.bench_compression [iterations]
+"""
+import gzip
+import json
+import sys
+import time
+import uuid
+
+from app.api.compression import brotli, zstandard
+
+
+def transactions_page() -> bytes:
+    data = []
+    for i in range(50):
+        wallet_id = str(uuid.uuid4())
+        data.append(
+            {
+                "transaction_id": str(uuid.uuid4()),
+                "cobo_id": str(20240000000000000 + i),
+                "request_id": str(uuid.uuid4()),
+                "wallet_id": wallet_id,
+                "type": "Withdrawal",
+                "status": "Completed",
+                "chain_id": "ETH",
+                "token_id": "ETH_USDT",
+                "source": {"source_type": "Org-Controlled", "wallet_id": wallet_id},
+                "destination": {
+                    "destination_type": "Address",
+                    "account_output": {
+                        "address": "0x" + uuid.uuid4().hex + uuid.uuid4().hex[:8],
+                        "amount": f"{i * 37 % 1000}.{i:06d}",
+                    },
+                },
+                "initiator_type": "API",
+                "transaction_hash": "0x" + uuid.uuid4().hex * 2,
+                "confirmed_num": 64,
+                "confirming_threshold": 64,
+                "created_timestamp": 1700000000000 + i * 1000,
+                "updated_timestamp": 1700000000000 + i * 1000 + 500,
+            }
+        )
+    return json.dumps({"status": "success", "data": data}).encode()
+
+
+def tokens_catalog() -> bytes:
+    data = [
+        {
+            "token_id": f"CHAIN{i % 40}_TOKEN{i}",
+            "chain_id": f"CHAIN{i % 40}",
+            "asset_id": f"TOKEN{i}",
+            "symbol": f"TOKEN{i}",
+            "name": f"Token number {i}",
+            "decimal": 18 if i % 3 else 6,
+            "icon_url": f"https://static.cobo.com/icons/token{i}.png",
+            "token_address": "0x" + uuid.uuid4().hex + uuid.uuid4().hex[:8],
+            "fee_token_id": f"CHAIN{i % 40}",
+            "can_deposit": True,
+            "can_withdraw": True,
+            "dust_threshold": "0.000001",
+        }
+        for i in range(500)
+    ]
+    return json.dumps({"status": "success", "data": data}).encode()
+
+
+def encoders():
+    for level in (1, 3, 6, 9):
+        yield f"gzip-{level}", lambda body, level=level: gzip.compress(
+            body, compresslevel=level, mtime=0
+        )
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"br-{quality}", lambda body, quality=quality: brotli.compress(
+                body, quality=quality
+            )
+    if zstandard is not None:
+        for level in (1, 3, 9, 19):
+            compressor = zstandard.ZstdCompressor(level=level)
+            yield f"zstd-{level}", compressor.compress
+
+
+def main(iterations: int = 200):
+    for name, body in (
+        ("transactions page", transactions_page()),
+        ("tokens catalog", tokens_catalog()),
+    ):
+        print(f"{name}: {len(body)} bytes uncompressed")
+        for encoding, compress in encoders():
+            compressed = compress(body)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                compress(body)
+            elapsed = (time.perf_counter() - start) / iterations
+            print(
+                f"  {encoding:>8}: {len(compressed):7d} bytes "
+                f"({len(compressed) / len(body):5.1%}), {elapsed * 1e6:8.0f} us"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,97 @@
+"""Parse + validate cost of contract call requests with large calldata.
+
+Compares the JSON body fast path (one pydantic validation, SDK objects built
+with model_construct) against the previous query-string path (parse the query
+string, assemble a dict, let the SDK validate it) and against handing the SDK
+a nested dict built from the JSON body.
+
+Usage: python -m benchmarks.bench_request_parsing [iterations]
+"""
+import json
+import sys
+import time
+from urllib.parse import parse_qs, urlencode
+
+from cobo_waas2 import models as sdk
+
+from app.models.transaction import ContractCallTransactionRequest
+
+SIZES = [1024, 64 * 1024, 1024 * 1024]
+
+
+def payload(calldata_bytes: int) -> dict:
+    return {
+        "request_id": "f47ac10b-58cc-4372-a567-0e02b2c3d479",
+        "chain_id": "ETH",
+        "source_wallet_id": "a9b8c7d6-58cc-4372-a567-0e02b2c3d479",
+        "source_address": "0x" + "1" * 40,
+        "destination_address": "0x" + "2" * 40,
+        "amount": "0",
+        "calldata": "0x" + "ab" * calldata_bytes,
+        "gas_price": "20000000000",
+        "gas_limit": 300000,
+        "fee_token_id": "ETH",
+    }
+
+
+def sdk_dict(fields: dict) -> dict:
+    return {
+        "request_id": fields["request_id"],
+        "chain_id": fields["chain_id"],
+        "source": {
+            "source_type": "Org-Controlled",
+            "wallet_id": fields["source_wallet_id"],
+            "address": fields["source_address"],
+        },
+        "destination": {
+            "destination_type": "EVM_Contract",
+            "address": fields["destination_address"],
+            "value": fields["amount"],
+            "calldata": fields["calldata"],
+        },
+        "fee": {
+            "fee_type": "EVM_Legacy",
+            "gas_price": fields["gas_price"],
+            "gas_limit": str(fields["gas_limit"]),
+            "token_id": fields["fee_token_id"],
+        },
+    }
+
+
+def body_fast_path(raw: bytes):
+    return ContractCallTransactionRequest.model_validate_json(raw).to_sdk()
+
+
+def body_dict_path(raw: bytes):
+    return sdk.ContractCallParams.from_dict(sdk_dict(json.loads(raw)))
+
+
+def query_string_path(query: str):
+    fields = {k: v[0] for k, v in parse_qs(query).items()}
+    fields["gas_limit"] = int(fields["gas_limit"])
+    return sdk.ContractCallParams.from_dict(sdk_dict(fields))
+
+
+def per_call_us(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 200):
+    for size in SIZES:
+        fields = payload(size)
+        raw = json.dumps(fields).encode()
+        query = urlencode(fields)
+        print(f"calldata {size // 1024} KiB (query string {len(query)} bytes):")
+        for name, func, arg in (
+            ("query string + SDK validation", query_string_path, query),
+            ("JSON body + SDK validation", body_dict_path, raw),
+            ("JSON body fast path", body_fast_path, raw),
+        ):
+            print(f"  {name:32s} {per_call_us(func, arg, iterations):10.1f} us")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
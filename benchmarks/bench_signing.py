@@ -0,0 +1,130 @@
+"""Per-request signing overhead on the hot read paths.
+
+Compares the SDK's SignHelper, which parses the private key and derives the
+public key on every request, with CachedSigner, and reports signing as a share
+of the client-side CPU of a full SDK call (upstream I/O replaced by a canned
+response so that only local work is measured).
+
+Signing stays a measurable share of the client-side CPU, around a third of a
+list call, because every request is signed over a fresh nonce: the Ed25519
+signature (~24us) and building the double SHA-256 digest (~5us) cannot be
+cached. The breakdown below shows that floor; CachedSigner only removes the
+per-request key parsing and public key derivation on top of it.
+
+Usage: python -m benchmarks.bench_signing [iterations]
+"""
+import hashlib
+import json
+import sys
+import time
+
+import cobo_waas2
+from cobo_waas2.api import TransactionsApi, WalletsApi
+from cobo_waas2.crypto.signing_helper import SignHelper
+
+from app.services.signing import CachedSigner, SigningApiClient
+
+CANNED_BODY = json.dumps(
+    {"data": [], "pagination": {"before": "", "after": "", "total_count": 0}}
+).encode()
+
+
+class CannedResponse:
+    status = 200
+    reason = "OK"
+    data = CANNED_BODY
+
+    def read(self):
+        return self.data
+
+    def getheaders(self):
+        return {"content-type": "application/json"}
+
+    def getheader(self, name, default=None):
+        return self.getheaders().get(name.lower(), default)
+
+
+class CannedRestClient:
+    def request(self, *args, **kwargs):
+        return CannedResponse()
+
+
+def hot_paths(api_client):
+    wallets = WalletsApi(api_client)
+    transactions = TransactionsApi(api_client)
+    return {
+        "list_token_balances_for_wallet": lambda: (
+            wallets.list_token_balances_for_wallet(
+                "f47ac10b-58cc-4372-a567-0e02b2c3d479", limit=50
+            )
+        ),
+        "list_transactions": lambda: transactions.list_transactions(
+            wallet_ids="f47ac10b-58cc-4372-a567-0e02b2c3d479",
+            statuses="Completed",
+            limit=50,
+        ),
+    }
+
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 5000):
+    api_secret = SignHelper.generate_api_key()["api_secret"]
+    configuration = cobo_waas2.Configuration(
+        api_private_key=api_secret, host="https://api.dev.cobo.com/v2"
+    )
+    signer = CachedSigner(api_secret)
+    params = {"limit": "50", "wallet_ids": "f47ac10b-58cc-4372-a567-0e02b2c3d479"}
+
+    sdk_sign = per_call_us(
+        lambda: SignHelper.generate_headers(
+            api_secret, b"", "GET", params, "/v2/transactions"
+        ),
+        iterations,
+    )
+    cached_sign = per_call_us(
+        lambda: signer.generate_headers(b"", "GET", params, "/v2/transactions"),
+        iterations,
+    )
+    print(
+        f"signing only: SignHelper {sdk_sign:.1f} us, CachedSigner {cached_sign:.1f} us"
+    )
+    digest = per_call_us(
+        lambda: SignHelper._build_unsigned_digest(
+            "GET", "/v2/transactions", "1700000000000", params, b""
+        ),
+        iterations,
+    )
+    sha256 = per_call_us(
+        lambda: hashlib.sha256(hashlib.sha256(b"x" * 128).digest()).digest(),
+        iterations,
+    )
+    ed25519 = per_call_us(
+        lambda: signer.signing_key.sign(b"x" * 32).signature.hex(), iterations
+    )
+    print(
+        f"per-request floor: Ed25519 signature {ed25519:.1f} us, digest "
+        f"{digest:.1f} us (of which double SHA-256 {sha256:.1f} us)"
+    )
+
+    sdk_client = cobo_waas2.ApiClient(configuration)
+    cached_client = SigningApiClient(configuration)
+    sdk_client.rest_client = cached_client.rest_client = CannedRestClient()
+    sdk_paths = hot_paths(sdk_client)
+    cached_paths = hot_paths(cached_client)
+    for name in sdk_paths:
+        before = per_call_us(sdk_paths[name], iterations)
+        after = per_call_us(cached_paths[name], iterations)
+        print(
+            f"{name}: {before:.1f} us -> {after:.1f} us per call, "
+            f"signing share {sdk_sign / before:.0%} -> {cached_sign / after:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
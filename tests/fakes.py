@@ -0,0 +1,55 @@
+"""Fakes of Cobo API responses shared by the tests and benchmarks."""
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+from cobo_waas2 import models as sdk
+
+
+def page(items: List[Any], offset: int, limit: int) -> SimpleNamespace:
+    """One page of ``items`` with an offset cursor, like the list endpoints."""
+    more = offset + limit < len(items)
+    return SimpleNamespace(
+        data=items[offset : offset + limit],
+        pagination=SimpleNamespace(after=str(offset + limit) if more else None),
+    )
+
+
+def wallets(count: int) -> List[SimpleNamespace]:
+    """Wallets ``w0`` to ``w<count - 1>`` as returned by list_wallets."""
+    return [
+        SimpleNamespace(
+            wallet_id=f"w{i}", wallet_type=None, wallet_subtype=None, name=None
+        )
+        for i in range(count)
+    ]
+
+
+def sdk_transaction(
+    transaction_id: str,
+    wallet_id: str = "wallet-1",
+    status: str = "Completed",
+    amount: str = "0.5",
+    created_timestamp: int = 0,
+    updated_timestamp: Optional[int] = None,
+) -> sdk.Transaction:
+    """An ETH deposit to ``0xdef``."""
+    return sdk.Transaction.from_dict(
+        {
+            "transaction_id": transaction_id,
+            "wallet_id": wallet_id,
+            "type": "Deposit",
+            "status": status,
+            "chain_id": "ETH",
+            "token_id": "ETH",
+            "source": {"source_type": "Org-Controlled", "wallet_id": wallet_id},
+            "destination": {
+                "destination_type": "Address",
+                "account_output": {"address": "0xdef", "amount": amount},
+            },
+            "initiator_type": "API",
+            "created_timestamp": created_timestamp,
+            "updated_timestamp": created_timestamp
+            if updated_timestamp is None
+            else updated_timestamp,
+        }
+    )
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from app.api.dependencies import cobo_service
+from app.main import app
+from app.services.address_index import AddressIndex, lookup_many, normalize_address
+from app.services.registry import CoboServiceRegistry
+from tests.fakes import page
+from tests.fakes import wallets as fake_wallets
+
+
+def address(chain_id: str, value: str, memo=None):
+    return SimpleNamespace(address=value, chain_id=chain_id, memo=memo)
+
+
+class FakeService:
+    def __init__(self, wallets: int, addresses_per_wallet: int):
+        self.wallets = fake_wallets(wallets)
+        self.addresses = {
+            wallet.wallet_id: [
+                address("ETH", f"0xABC{i:03d}{j:03d}")
+                for j in range(addresses_per_wallet)
+            ]
+            for i, wallet in enumerate(self.wallets)
+        }
+        self.calls = 0
+
+    async def list_wallets(self, limit=10, after=None):
+        self.calls += 1
+        return page(self.wallets, int(after or 0), limit)
+
+    async def list_wallet_addresses(self, wallet_id, limit=10, after=None):
+        self.calls += 1
+        return page(self.addresses[wallet_id], int(after or 0), limit)
+
+
+def test_normalize_address():
+    assert normalize_address("0xAbCd") == "0xabcd"
+    assert normalize_address("BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4") == (
+        "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4"
+    )
+    # Base58 is case-sensitive
+    assert normalize_address("1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2") == (
+        "1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2"
+    )
+
+
+def test_rebuild_pages_all_wallets_and_addresses():
+    service = FakeService(wallets=120, addresses_per_wallet=60)
+    index = AddressIndex()
+    asyncio.run(index.rebuild(service, concurrency=4))
+
+    assert index.ready
+    assert len(index) == 120 * 60
+    assert index.wallets_indexed == 120
+    # 3 pages of wallets, 2 pages of addresses per wallet
+    assert service.calls == 3 + 120 * 2
+    assert index.lookup("0xabc119059") == ("ETH", "w119")
+    assert index.lookup("0xabc119059", chain_id="BTC") is None
+
+
+def test_lookup_many_and_memos():
+    index = AddressIndex()
+    index.add_addresses("w1", [address("ETH", "0xAA"), address("XRP", "rX", "42")])
+    results = lookup_many(
+        index,
+        [("0xaa", None, None), ("rX", "XRP", "42"), ("rX", "XRP", None)],
+    )
+    assert [result["wallet_id"] for result in results] == ["w1", "w1", None]
+    assert results[0]["chain_id"] == "ETH"
+
+
+def test_lookup_endpoint(monkeypatch):
+    client = TestClient(app)
+    index = AddressIndex()
+    monkeypatch.setattr(cobo_service, "address_index", index)
+    body = {"addresses": [{"address": "0xAA"}, {"address": "0xBB"}]}
+
+    assert client.post("/api/addresses/lookup", json=body).status_code == 503
+
+    index.add("ETH", "0xaa", "w1")
+    index.ready = True
+    response = client.post("/api/addresses/lookup", json=body)
+    assert response.status_code == 200
+    assert [result["wallet_id"] for result in response.json()["data"]] == [
+        "w1",
+        None,
+    ]
+    assert client.get("/api/addresses/index").json()["data"]["addresses"] == 1
+
+
+def test_created_addresses_are_indexed(monkeypatch):
+    async def call(method, *args, **kwargs):
+        return [address("ETH", "0xABCD")]
+
+    index = AddressIndex()
+    monkeypatch.setattr(cobo_service, "address_index", index)
+    monkeypatch.setattr(cobo_service, "_call", call)
+    asyncio.run(cobo_service.create_new_address("w7", "ETH"))
+    assert index.lookup("0xabcd", "ETH") == ("ETH", "w7")
+
+
+def test_index_survives_tenant_eviction():
+    tenants = {"acme": {"api_secret": "aa" * 32, "env": "sandbox"}}
+    registry = CoboServiceRegistry(cobo_service, tenants, idle_timeout=0)
+    acme = registry.get("acme")
+    acme.address_index.add("ETH", "0xaa", "w1")
+    acme.address_index.ready = True
+    replacement = registry.get("acme")
+    assert replacement is not acme
+    assert replacement.address_index is acme.address_index
+    assert replacement.address_index.lookup("0xaa") == ("ETH", "w1")
@@ -1,5 +1,7 @@
+from cobo_waas2.exceptions import ApiException
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api.dependencies import cobo_service
 
 client = TestClient(app)
 
@@ -10,4 +12,64 @@ def test_root():
     assert response.json() == {"message": "Welcome to Cobo WaaS 2 Demo"}
 
 
+def test_healthz():
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_readyz_gated_on_warm_up_and_circuit():
+    cobo_service.warmed_up = False
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+
+    cobo_service.warmed_up = True
+    try:
+        assert client.get("/readyz").status_code == 200
+
+        for _ in range(cobo_service.circuit.failure_threshold):
+            cobo_service.circuit.record_failure()
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["circuit"] == "open"
+    finally:
+        cobo_service.warmed_up = False
+        cobo_service.circuit.record_success()
+
+
+def test_unknown_tenant():
+    response = client.get("/api/wallets", headers={"X-Cobo-Tenant": "unknown"})
+    assert response.status_code == 404
+    assert client.get("/api/tenants/unknown/wallets").status_code == 404
+
+
+def test_transaction_events_stream(monkeypatch):
+    class Completed:
+        def to_dict(self):
+            return {"transaction_id": "tx-1", "status": "Completed"}
+
+    async def fetch(transaction_id):
+        return Completed()
+
+    monkeypatch.setattr(cobo_service.transaction_watcher, "fetch_transaction", fetch)
+    response = client.get("/api/transactions/tx-1/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: status\ndata: ")
+    assert '"transaction_status": "Completed"' in response.text
+
+
 # Add more tests for each API endpoint
+
+
+def test_watch_unknown_transaction_returns_404(monkeypatch):
+    async def fetch(transaction_id):
+        raise ApiException(status=404, reason="Not Found")
+
+    monkeypatch.setattr(cobo_service.transaction_watcher, "fetch_transaction", fetch)
+    response = client.get("/api/transactions/tx-404/watch", params={"timeout": 5})
+    assert response.status_code == 404
+    assert response.json()["status"] == "error"
+    events = client.get("/api/transactions/tx-404/events")
+    assert events.text.startswith("event: error\ndata: ")
@@ -0,0 +1,98 @@
+import asyncio
+from cobo_waas2 import models as sdk
+from app.services.backfill import TransactionBackfill, parse_timestamp
+from app.services.rate_limiter import background_reserve
+from app.services.transaction_store import TransactionStore
+from tests.fakes import page, sdk_transaction
+
+
+def transaction(i: int) -> sdk.Transaction:
+    return sdk_transaction(f"tx-{i}", created_timestamp=i * 100)
+
+
+class FakeService:
+    """Serves transactions created every 100ms, newest first, 50 per page."""
+
+    namespace = "test"
+
+    def __init__(self, count: int, fail_after: int = None):
+        self.transactions = [transaction(i) for i in range(count)]
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def token_decimals(self, token_id):
+        return 18
+
+    async def list_transactions(
+        self, min_created_timestamp, max_created_timestamp, limit, after
+    ):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise ValueError("upstream gone")
+        matching = [
+            t
+            for t in reversed(self.transactions)
+            if min_created_timestamp <= t.created_timestamp <= max_created_timestamp
+        ]
+        return page(matching, int(after or 0), limit)
+
+
+def test_backfill_fetches_every_window():
+    store = TransactionStore()
+    service = FakeService(1000)
+    backfill = TransactionBackfill(
+        service, store, 0, 100_000, window=10, concurrency=3, batch_size=120
+    )
+    asyncio.run(backfill.run())
+    status = backfill.status()
+    assert status["state"] == "completed"
+    assert status["windows_total"] == status["windows_done"] == 10
+    assert status["rows"] == store.count("test") == 1000
+    assert store.get("test", "tx-999")["amount"] == "0.500000000000000000"
+
+
+def test_backfill_resumes_from_checkpoint():
+    store = TransactionStore()
+    failing = TransactionBackfill(
+        FakeService(1000, fail_after=7), store, 0, 100_000, window=25, batch_size=50
+    )
+    asyncio.run(failing.run())
+    assert failing.state == "failed"
+    stored = store.count("test")
+    assert 0 < stored < 1000
+
+    service = FakeService(1000)
+    resumed = TransactionBackfill(service, store, 0, 100_000, window=25, batch_size=50)
+    asyncio.run(resumed.run())
+    assert resumed.state == "completed"
+    assert store.count("test") == 1000
+    # Only the pages not checkpointed by the failed run are fetched again
+    assert service.calls == (1000 - stored) // 50
+
+
+def test_windows_are_aligned_and_clipped():
+    backfill = TransactionBackfill(FakeService(0), TransactionStore(), 1500, 4200, 1)
+    assert backfill.windows() == [
+        (1500, 2000),
+        (2000, 3000),
+        (3000, 4000),
+        (4000, 4200),
+    ]
+    assert parse_timestamp("1700000000000") == 1700000000000
+    assert parse_timestamp("2023-11-14T22:13:20") == 1700000000000
+
+
+def test_backfill_runs_as_background_work():
+    reserves = set()
+
+    class RecordingService(FakeService):
+        async def list_transactions(self, *args, **kwargs):
+            reserves.add(background_reserve.get())
+            return await super().list_transactions(*args, **kwargs)
+
+    backfill = TransactionBackfill(
+        RecordingService(200), TransactionStore(), 0, 20_000, window=5, reserve=0.3
+    )
+    asyncio.run(backfill.run())
+    assert backfill.state == "completed"
+    assert reserves == {0.3}
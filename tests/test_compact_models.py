@@ -0,0 +1,118 @@
+from decimal import Decimal
+from cobo_waas2 import models as sdk
+from app.models.compact import (
+    CompactBalance,
+    CompactTransaction,
+    CompactWallet,
+    parse_amount,
+)
+from app.services.transaction_store import TransactionStore
+
+TRANSACTION = {
+    "transaction_id": "f47ac10b-58cc-4372-a567-0e02b2c3d479",
+    "wallet_id": "a9b8c7d6-58cc-4372-a567-0e02b2c3d479",
+    "type": "Withdrawal",
+    "status": "Completed",
+    "chain_id": "ETH",
+    "token_id": "ETH_USDT",
+    "source": {
+        "source_type": "Org-Controlled",
+        "wallet_id": "a9b8c7d6-58cc-4372-a567-0e02b2c3d479",
+    },
+    "destination": {
+        "destination_type": "Address",
+        "account_output": {"address": "0xdef", "amount": "1.000001"},
+    },
+    "initiator_type": "API",
+    "transaction_hash": "0x" + "ab" * 32,
+    "created_timestamp": 1700000000000,
+    "updated_timestamp": 1700000005000,
+}
+
+
+def test_parse_amount():
+    assert parse_amount("1.5") == (15, 1)
+    assert parse_amount("1.5", 6) == (1500000, 6)
+    # Finer precision than the token's decimals is kept, not truncated
+    assert parse_amount("0.1234567", 6) == (1234567, 7)
+    assert parse_amount(None, 18) == (0, 18)
+
+
+def test_compact_transaction_from_sdk():
+    transaction = sdk.Transaction.from_dict(TRANSACTION)
+    compact = CompactTransaction.from_sdk(transaction, decimals=6)
+    assert not hasattr(compact, "__dict__")
+    assert compact.transaction_id is transaction.transaction_id
+    assert compact.status == "Completed"
+    assert compact.amount == 1000001
+    assert compact.amount_decimal == Decimal("1.000001")
+    assert compact.to_dict()["amount"] == "1.000001"
+
+
+def test_compact_wallet_and_balance_from_sdk():
+    wallet = sdk.WalletInfo.from_dict(
+        {
+            "wallet_id": "w1",
+            "wallet_type": "Custodial",
+            "wallet_subtype": "Asset",
+            "name": "Treasury",
+            "org_id": "org",
+        }
+    )
+    assert CompactWallet.from_sdk(wallet).to_dict() == {
+        "wallet_id": "w1",
+        "wallet_type": "Custodial",
+        "wallet_subtype": "Asset",
+        "name": "Treasury",
+    }
+    balance = sdk.TokenBalance.from_dict(
+        {
+            "token_id": "BTC",
+            "balance": {"total": "1.5", "available": "1.25", "pending": "0.25"},
+        }
+    )
+    compact = CompactBalance.from_sdk("w1", balance, decimals=8)
+    assert (compact.total, compact.available, compact.pending, compact.locked) == (
+        150000000,
+        125000000,
+        25000000,
+        0,
+    )
+    assert compact.to_dict()["available"] == "1.25000000"
+
+
+def test_small_and_zero_amounts_are_not_in_exponent_form():
+    zero = sdk.Transaction.from_dict(
+        {
+            **TRANSACTION,
+            "destination": {
+                "destination_type": "Address",
+                "account_output": {"address": "0xdef", "amount": "0"},
+            },
+        }
+    )
+    assert CompactTransaction.from_sdk(zero, 18).to_dict()["amount"] == (
+        "0.000000000000000000"
+    )
+    tiny = sdk.Transaction.from_dict(
+        {
+            **TRANSACTION,
+            "destination": {
+                "destination_type": "Address",
+                "account_output": {"address": "0xdef", "amount": "0.00000005"},
+            },
+        }
+    )
+    compact = CompactTransaction.from_sdk(tiny, 8)
+    assert compact.to_dict()["amount"] == "0.00000005"
+
+    store = TransactionStore(":memory:")
+    store.upsert_many("ns", [compact])
+    assert store.get("ns", compact.transaction_id)["amount"] == "0.00000005"
+
+    balance = sdk.TokenBalance.from_dict(
+        {"token_id": "ETH", "balance": {"total": "0.00000005", "available": "0"}}
+    )
+    assert CompactBalance.from_sdk("w1", balance, 8).to_dict()["available"] == (
+        "0.00000000"
+    )
@@ -0,0 +1,73 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.api.compression import CompressionMiddleware, negotiate
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+LARGE = {"data": [{"token_id": f"TOKEN{i}", "decimal": 18} for i in range(200)]}
+
+
+@app.get("/large")
+async def large():
+    return LARGE
+
+
+@app.get("/small")
+async def small():
+    return {"data": []}
+
+
+@app.get("/stream")
+async def stream():
+    async def events():
+        yield "event: status\ndata: {}\n\n" * 100
+        yield ": keepalive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+client = TestClient(app)
+
+
+def test_large_responses_are_compressed_with_etag():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.json() == LARGE
+
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] != response.headers["etag"]
+
+
+def test_if_none_match_returns_304_for_any_representation():
+    etag = client.get("/large", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get(
+        "/large", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] != etag
+
+    changed = client.get("/large", headers={"If-None-Match": '"0123"'})
+    assert changed.status_code == 200
+
+
+def test_small_and_streamed_responses_are_left_alone():
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "etag" in small.headers
+    stream = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers
+    assert "etag" not in stream.headers
+    assert stream.text.endswith(": keepalive\n\n")
+
+
+def test_negotiate_honours_weights_and_preference():
+    assert negotiate("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate("*;q=0.1", ["br", "gzip"]) == "br"
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+    assert negotiate("", ["gzip"]) is None
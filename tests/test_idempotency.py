@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from cobo_waas2 import models as sdk
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.dependencies import cobo_service
+from app.services.idempotency import (
+    REPLAYED_HEADER,
+    IdempotencyConflict,
+    IdempotencyStore,
+)
+
+
+def counting_call(calls, status_code=200, delay=0):
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return JSONResponse(
+            content={"status": "success", "n": len(calls)}, status_code=status_code
+        )
+
+    return call
+
+
+def test_concurrent_and_repeated_requests_call_once():
+    async def run():
+        store = IdempotencyStore()
+        calls = []
+        call = counting_call(calls, delay=0.05)
+        first, second = await asyncio.gather(
+            store.run("ns:r1", "fp", call), store.run("ns:r1", "fp", call)
+        )
+        third = await store.run("ns:r1", "fp", call)
+        return calls, first, second, third
+
+    calls, first, second, third = asyncio.run(run())
+    assert len(calls) == 1
+    assert first is second
+    assert third.body == first.body
+    assert third.headers[REPLAYED_HEADER] == "true"
+
+
+def test_failures_are_not_stored_and_conflicts_are_rejected():
+    async def run():
+        store = IdempotencyStore()
+        calls = []
+        await store.run("ns:r1", "fp", counting_call(calls, status_code=500))
+        await store.run("ns:r1", "fp", counting_call(calls))
+        assert len(calls) == 2
+        with pytest.raises(IdempotencyConflict):
+            await store.run("ns:r1", "other", counting_call(calls))
+
+    asyncio.run(run())
+
+
+def test_entries_persist_and_expire(tmp_path):
+    path = str(tmp_path / "idempotency.db")
+
+    async def run():
+        calls = []
+        store = IdempotencyStore(path, ttl=60)
+        await store.run("ns:r1", "fp", counting_call(calls))
+        store.close()
+
+        store = IdempotencyStore(path, ttl=60)
+        response = await store.run("ns:r1", "fp", counting_call(calls))
+        assert len(calls) == 1 and REPLAYED_HEADER in response.headers
+        assert store.purge_expired(now=10**12) == 1
+        await store.run("ns:r1", "fp", counting_call(calls))
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_withdraw_retry_is_deduplicated(monkeypatch):
+    calls = []
+
+    async def withdraw(*args):
+        calls.append(args)
+        return {"request_id": args[4], "transaction_id": "tx-1"}
+
+    monkeypatch.setattr(cobo_service, "withdraw_from_wallet", withdraw)
+    client = TestClient(app)
+    params = {"amount": 1, "token": "ETH", "address": "0xabc", "request_id": "w-1"}
+    first = client.post("/api/wallets/w/withdraw", params=params)
+    second = client.post("/api/wallets/w/withdraw", params=params)
+    assert first.json() == second.json()
+    assert len(calls) == 1
+    conflict = client.post("/api/wallets/w/withdraw", params={**params, "amount": 2})
+    assert conflict.status_code == 409
+
+    generated = client.post(
+        "/api/wallets/w/withdraw", params={**params, "request_id": None}
+    )
+    assert generated.json()["data"]["request_id"] not in (None, "w-1")
+
+
+def test_withdraw_sends_valid_transfer_params(monkeypatch):
+    sent = []
+
+    async def call(method, *args, **kwargs):
+        sent.append((method.__name__, args))
+        return SimpleNamespace(to_dict=lambda: {"request_id": args[0].request_id})
+
+    monkeypatch.setattr(cobo_service, "_call", call)
+    client = TestClient(app)
+    response = client.post(
+        "/api/wallets/w/withdraw",
+        params={
+            "amount": 1.5,
+            "token": "ETH",
+            "address": "0xabc",
+            "request_id": "w-2",
+            "fee_amount": 0.01,
+        },
+    )
+    assert response.status_code == 200
+    ((name, (body,)),) = sent
+    assert name == "create_transfer_transaction"
+    params = body.to_dict()
+    assert sdk.TransferParams.from_dict(params).to_dict() == params
+    assert params["request_id"] == "w-2"
+    assert params["source"]["wallet_id"] == "w"
+    assert params["destination"]["account_output"] == {
+        "address": "0xabc",
+        "amount": "1.5",
+    }
+    assert params["fee"]["max_fee_amount"] == "0.01"
@@ -0,0 +1,64 @@
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.dependencies import cobo_service
+from app.api.profiling import ProfilingMiddleware
+from app.api.routes import execute_service_call
+from app.config import settings
+from app.services.profiling import SlowRequestLog, sample_stacks
+
+log = SlowRequestLog(size=2)
+profiled_app = FastAPI()
+profiled_app.add_middleware(ProfilingMiddleware, log=log, sample_rate=1.0)
+
+
+@profiled_app.get("/upstream/{delay}")
+async def upstream(delay: float):
+    def sdk_call():
+        time.sleep(delay)
+        return {"data": [1, 2, 3]}
+
+    return await execute_service_call(cobo_service._call, sdk_call)
+
+
+def test_sampled_requests_record_span_breakdown():
+    client = TestClient(profiled_app)
+    for delay in (0.03, 0.01, 0.02):
+        assert client.get(f"/upstream/{delay}").status_code == 200
+    top = log.top()
+    assert log.recorded == 3
+    assert [entry["path"] for entry in top] == ["/upstream/0.03", "/upstream/0.02"]
+    spans = top[0]["spans"]
+    assert spans["upstream_call"]["wall_ms"] >= 30
+    assert spans["upstream_call"]["count"] == 1
+    assert {"rate_limit_wait", "executor_wait", "serialization", "event_loop"} <= set(
+        spans
+    )
+    assert top[0]["status"] == 200
+
+
+def test_profiling_endpoints_are_disabled_by_default(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/debug/profiling/slow").status_code == 404
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    response = client.get("/debug/profiling/slow")
+    assert response.json()["data"] == []
+    capture = client.get("/debug/profiling/capture", params={"seconds": 0.05})
+    assert capture.status_code == 200
+    assert capture.headers["content-type"].startswith("text/plain")
+
+
+def test_sample_stacks_collapses_other_threads():
+    def busy_worker():
+        time.sleep(0.2)
+
+    worker = threading.Thread(target=busy_worker, name="worker")
+    worker.start()
+    stacks = sample_stacks(0.05, interval=0.001)
+    worker.join()
+    worker_stacks = [stack for stack in stacks if stack.startswith("worker;")]
+    assert worker_stacks
+    assert all("test_profiling.py:busy_worker" in stack for stack in worker_stacks)
+    assert not any("sample_stacks" in stack for stack in stacks)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from cobo_waas2 import models as sdk
+from app.models.compact import CompactTransaction
+from app.services.rate_limiter import TokenBucket
+from app.services.reconciler import WalletReconciler
+from app.services.transaction_store import TransactionStore
+from tests.fakes import page, sdk_transaction
+from tests.fakes import wallets as fake_wallets
+
+NOW = int(time.time() * 1000)
+
+
+def transaction(transaction_id: str, wallet_id: str, status: str) -> sdk.Transaction:
+    return sdk_transaction(
+        transaction_id, wallet_id, status, amount="1", created_timestamp=NOW - 1000
+    )
+
+
+class FakeService:
+    namespace = "test"
+
+    def __init__(self, wallets: int):
+        self.wallets = fake_wallets(wallets)
+        self.transactions = [
+            transaction("tx-1", "w1", "Completed"),
+            transaction("tx-2", "w2", "Confirming"),
+            transaction("tx-3", "w3", "Completed"),
+        ]
+        self.balances = {wallet.wallet_id: "1.0" for wallet in self.wallets}
+        self.calls = {"wallets": 0, "transactions": 0, "balances": 0}
+
+    def token_decimals(self, token_id):
+        return 18
+
+    async def list_wallets(self, limit, after):
+        self.calls["wallets"] += 1
+        return page(self.wallets, int(after or 0), limit)
+
+    async def list_transactions(self, wallet_ids, min_created_timestamp, limit, after):
+        self.calls["transactions"] += 1
+        wallet_ids = wallet_ids.split(",")
+        matching = [t for t in self.transactions if t.wallet_id in wallet_ids]
+        return page(matching, int(after or 0), limit)
+
+    async def get_wallet_balance(self, wallet_id, limit, after):
+        self.calls["balances"] += 1
+        total = self.balances[wallet_id]
+        balance = SimpleNamespace(total=total, available=total, pending="0", locked="0")
+        return page([SimpleNamespace(token_id="ETH", balance=balance)], 0, limit)
+
+
+def local_store(service: FakeService) -> TransactionStore:
+    store = TransactionStore()
+    # tx-1 is missing locally, tx-2 has a stale status, tx-3 is in sync
+    store.upsert_many(
+        "test",
+        [
+            CompactTransaction.from_sdk(transaction("tx-2", "w2", "Broadcasting")),
+            CompactTransaction.from_sdk(transaction("tx-3", "w3", "Completed")),
+        ],
+    )
+    return store
+
+
+def test_pass_reports_discrepancies_then_skips_unchanged_wallets():
+    service = FakeService(120)
+    reconciler = WalletReconciler(local_store(service))
+    report = asyncio.run(reconciler.run_once(service))
+    assert report["completed_at"] is not None
+    assert report["wallets_checked"] == 120
+    assert report["balance_checks"] == 120
+    kinds = {(d["kind"], d["transaction_id"]) for d in report["discrepancies"]}
+    assert kinds == {("missing_locally", "tx-1"), ("status_mismatch", "tx-2")}
+
+    service.calls = dict.fromkeys(service.calls, 0)
+    report = asyncio.run(reconciler.run_once(service))
+    assert report["wallets_changed"] == 0
+    # One list_wallets and one bulk list_transactions per page of 50 wallets
+    assert service.calls == {"wallets": 3, "transactions": 3, "balances": 0}
+
+
+def test_balance_drift_without_transactions_is_reported():
+    service = FakeService(10)
+    reconciler = WalletReconciler(local_store(service), balance_interval=0)
+    asyncio.run(reconciler.run_once(service))
+    service.balances["w5"] = "2"
+    service.balances["w6"] = "1.000"
+    report = asyncio.run(reconciler.run_once(service))
+    assert report["discrepancies"] == [
+        {
+            "wallet_id": "w5",
+            "kind": "balance_changed_without_transactions",
+            "transaction_id": None,
+        }
+    ]
+
+
+def test_passes_are_incremental():
+    service = FakeService(120)
+    store = local_store(service)
+    reconciler = WalletReconciler(store, batch_size=50)
+    first = asyncio.run(reconciler.run_once(service))
+    assert first["completed_at"] is None and first["wallets_checked"] == 50
+    asyncio.run(reconciler.run_once(service))
+    last = asyncio.run(reconciler.run_once(service))
+    assert last["completed_at"] is not None and last["wallets_checked"] == 120
+    assert store.reconciliation_cursor("test") == (None, None)
+
+
+def test_runs_use_the_service_they_are_given():
+    # The registry replaces evicted services, a run must not reuse the old one
+    service = FakeService(120)
+    reconciler = WalletReconciler(local_store(service), batch_size=50)
+    asyncio.run(reconciler.run_once(service))
+    replacement = FakeService(120)
+    report = asyncio.run(reconciler.run_once(replacement))
+    assert report["wallets_checked"] == 100
+    assert service.calls["wallets"] == 1 and replacement.calls["wallets"] == 1
+
+
+def test_background_calls_leave_reserve():
+    bucket = TokenBucket(rate=10)
+    for _ in range(5):
+        assert bucket.try_acquire(reserve=0.5)
+    assert not bucket.try_acquire(reserve=0.5)
+    assert bucket.try_acquire()
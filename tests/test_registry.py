@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.api.dependencies import cobo_service
+from app.services.registry import CoboServiceRegistry
+from app.services.rate_limiter import TokenBucket
+
+TENANTS = {
+    "acme": {"api_secret": "aa" * 32, "env": "sandbox"},
+    "acme-alias": {"api_secret": "aa" * 32, "env": "sandbox"},
+    "globex": {"api_secret": "bb" * 32, "env": "sandbox", "rate_limit": 5},
+    "initech": {"api_secret": "cc" * 32, "env": "production"},
+}
+
+
+def test_services_are_keyed_by_credentials_and_env():
+    registry = CoboServiceRegistry(cobo_service, TENANTS)
+    acme = registry.get("acme")
+    assert registry.get("acme-alias") is acme
+    globex = registry.get("globex")
+    assert globex is not acme
+    assert globex.rate_limiter.rate == 5
+    assert globex.namespace != acme.namespace
+    with pytest.raises(KeyError):
+        registry.get("unknown")
+
+
+def test_least_recently_used_tenant_is_evicted():
+    registry = CoboServiceRegistry(cobo_service, TENANTS, max_tenants=2)
+    acme = registry.get("acme")
+    registry.get("globex")
+    registry.get("acme")
+    registry.get("initech")
+    assert len(registry) == 2
+    assert registry.get("acme") is acme
+    assert len(registry) == 2
+
+
+def test_idle_tenants_are_evicted():
+    registry = CoboServiceRegistry(cobo_service, TENANTS, idle_timeout=0)
+    acme = registry.get("acme")
+    assert registry.get("acme") is not acme
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert TokenBucket(rate=0).try_acquire(1000)
+
+
+def test_background_reserve_with_small_capacity():
+    # Capacity 1 cannot hold half a token in reserve plus the one taken
+    for rate in (1, 1.5):
+        bucket = TokenBucket(rate=rate)
+        assert bucket.try_acquire(reserve=0.5)
+        assert not bucket.try_acquire(reserve=0.5)
+        bucket.tokens = bucket.capacity - 0.01
+        assert (
+            asyncio.run(asyncio.wait_for(bucket.acquire(reserve=0.5), timeout=1))
+            is None
+        )
+    # Larger buckets still keep the reserve for interactive calls
+    bucket = TokenBucket(rate=10)
+    for _ in range(5):
+        assert bucket.try_acquire(reserve=0.5)
+    assert not bucket.try_acquire(reserve=0.5)
+    assert bucket.try_acquire()
+
+
+def test_services_with_background_work_are_not_evicted():
+    async def run():
+        registry = CoboServiceRegistry(cobo_service, TENANTS, idle_timeout=0)
+        acme = registry.get("acme")
+        task = acme.track_background(asyncio.create_task(asyncio.sleep(0.01)))
+        assert registry.get("acme") is acme
+        await task
+        assert not acme.busy
+        assert registry.get("acme") is not acme
+
+    asyncio.run(run())
+
+
+def test_services_with_watched_transactions_are_not_evicted():
+    async def fetch(transaction_id):
+        return SimpleNamespace(to_dict=lambda: {"status": "Submitted"})
+
+    async def run():
+        registry = CoboServiceRegistry(cobo_service, TENANTS, idle_timeout=0)
+        acme = registry.get("acme")
+        acme.transaction_watcher.fetch_transaction = fetch
+        waiter = asyncio.create_task(
+            acme.transaction_watcher.wait("tx-1", "Submitted", timeout=5)
+        )
+        await asyncio.sleep(0.01)
+        # The webhook reaches the watcher the client is waiting on
+        service = registry.get("acme")
+        assert service is acme
+        await service.handle_webhook(
+            {"data": {"transaction_id": "tx-1", "status": "Completed"}}
+        )
+        assert (await waiter)["transaction_status"] == "Completed"
+        assert registry.get("acme") is not acme
+
+    asyncio.run(run())
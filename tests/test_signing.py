@@ -0,0 +1,82 @@
+import json
+import time
+import cobo_waas2
+from cobo_waas2.crypto.signing_helper import SignHelper
+from nacl.signing import VerifyKey
+from app.services.signing import CachedSigner, SigningApiClient
+
+
+def test_cached_signer_matches_sign_helper():
+    keys = SignHelper.generate_api_key()
+    signer = CachedSigner(keys["api_secret"])
+    headers = signer.generate_headers(
+        body=b'{"a": 1}', method="POST", params={"limit": "10"}, path="/v2/x"
+    )
+    assert headers["Biz-Api-Key"] == keys["api_key"]
+
+    signature, api_key = SignHelper.sign(
+        keys["api_secret"],
+        "POST",
+        "/v2/x",
+        headers["Biz-Api-Nonce"],
+        params={"limit": "10"},
+        body=b'{"a": 1}',
+    )
+    # Ed25519 signatures are deterministic
+    assert headers["Biz-Api-Signature"] == signature.hex()
+    digest = SignHelper._build_unsigned_digest(
+        "POST", "/v2/x", headers["Biz-Api-Nonce"], {"limit": "10"}, b'{"a": 1}'
+    )
+    VerifyKey(api_key).verify(digest, signature)
+
+
+class RecordingRestClient:
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, url, headers=None, body=None, **kwargs):
+        self.requests.append(
+            {"method": method, "url": url, "headers": dict(headers), "body": body}
+        )
+
+
+def test_signing_api_client_matches_sdk_request(monkeypatch):
+    # Same nonce for both clients, so the signed requests must be identical
+    monkeypatch.setattr(time, "time", lambda: 1700000000.123)
+    keys = SignHelper.generate_api_key()
+    configuration = cobo_waas2.Configuration(
+        api_private_key=keys["api_secret"], host="https://api.dev.cobo.com/v2"
+    )
+    url = "https://api.dev.cobo.com/v2/wallets?limit=10&after=&wallet_type=MPC"
+    body = {"name": "wallet", "amount": "1.5"}
+
+    sent = []
+    for client in (
+        SigningApiClient(configuration),
+        cobo_waas2.ApiClient(configuration),
+    ):
+        client.rest_client = RecordingRestClient()
+        client.call_api(
+            "POST", url, header_params={"Content-Type": "application/json"}, body=body
+        )
+        sent.append(client.rest_client.requests[0])
+    signed, expected = sent
+    assert signed == expected
+    # Empty query parameters are dropped before signing
+    assert (
+        signed["url"] == "https://api.dev.cobo.com/v2/wallets?limit=10&wallet_type=MPC"
+    )
+    assert signed["body"] == body
+    assert signed["headers"]["Content-Type"] == "application/json"
+    assert signed["headers"]["Biz-Api-Key"] == keys["api_key"]
+    assert signed["headers"]["Biz-Api-Nonce"] == "1700000000123"
+    digest = SignHelper._build_unsigned_digest(
+        "POST",
+        "/v2/wallets",
+        "1700000000123",
+        {"limit": "10", "wallet_type": "MPC"},
+        json.dumps(body).encode("utf-8"),
+    )
+    VerifyKey(bytes.fromhex(keys["api_key"])).verify(
+        digest, bytes.fromhex(signed["headers"]["Biz-Api-Signature"])
+    )
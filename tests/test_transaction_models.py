@@ -0,0 +1,95 @@
+import pytest
+from cobo_waas2 import models as sdk
+from pydantic import ValidationError
+from app.models.transaction import (
+    TransferTransactionRequest,
+    ContractCallTransactionRequest,
+    MessageSignTransactionRequest,
+)
+
+
+def test_transfer_request_builds_valid_sdk_params():
+    transfer = TransferTransactionRequest(
+        request_id="req-1",
+        source_wallet_id="wallet-1",
+        source_address="0xabc",
+        destination_address="0xdef",
+        token_id="ETH",
+        amount="1.5",
+        max_fee="0.01",
+        note="rent",
+    )
+    params = transfer.to_sdk().to_dict()
+    # The SDK accepts what we built without modification
+    assert sdk.TransferParams.from_dict(params).to_dict() == params
+    assert params["destination"]["account_output"] == {
+        "address": "0xdef",
+        "amount": "1.5",
+    }
+    assert params["fee"]["fee_type"] == "Fixed"
+
+
+def test_transfer_request_with_utxo_outputs():
+    transfer = TransferTransactionRequest(
+        request_id="req-1",
+        source_wallet_id="wallet-1",
+        destination_address="bc1q...",
+        token_id="BTC",
+        amount="0.3",
+        fee_rate="12",
+        utxo_outputs=[{"address": "bc1qa", "amount": "0.1"}, {"address": "bc1qb"}],
+    )
+    params = transfer.to_sdk().to_dict()
+    assert sdk.TransferParams.from_dict(params).to_dict() == params
+    assert "account_output" not in params["destination"]
+    assert len(params["destination"]["utxo_outputs"]) == 2
+
+
+def test_contract_call_and_message_sign_requests():
+    contract_call = ContractCallTransactionRequest(
+        request_id="req-2",
+        chain_id="ETH",
+        source_wallet_id="wallet-1",
+        source_address="0xabc",
+        destination_address="0xdef",
+        calldata="0x" + "ab" * 1024,
+        max_fee_per_gas="30",
+        max_priority_fee_per_gas="2",
+        gas_limit=60000,
+        fee_token_id="ETH",
+    )
+    params = contract_call.to_sdk().to_dict()
+    assert sdk.ContractCallParams.from_dict(params).to_dict() == params
+    assert params["fee"]["gas_limit"] == "60000"
+
+    message_sign = MessageSignTransactionRequest(
+        request_id="req-3",
+        chain_id="ETH",
+        source_wallet_id="wallet-1",
+        source_address="0xabc",
+        message="aGVsbG8=",
+    )
+    params = message_sign.to_sdk().to_dict()
+    assert sdk.MessageSignParams.from_dict(params).to_dict() == params
+
+
+def test_invalid_requests_are_rejected():
+    with pytest.raises(ValidationError):
+        ContractCallTransactionRequest(
+            request_id="req-2",
+            chain_id="ETH",
+            source_wallet_id="wallet-1",
+            source_wallet_subtype="Asset",
+            source_address="0xabc",
+            destination_address="0xdef",
+            calldata="0x",
+        )
+    with pytest.raises(ValidationError):
+        # Amounts are decimal strings, as in the SDK
+        TransferTransactionRequest(
+            request_id="req-1",
+            source_wallet_id="wallet-1",
+            destination_address="0xdef",
+            token_id="ETH",
+            amount=1.5,
+        )
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from cobo_waas2.exceptions import ApiException
+from app.services.transaction_watcher import TransactionWatchError, TransactionWatcher
+
+
+class FakeTransaction:
+    def __init__(self, status):
+        self.status = status
+
+    def to_dict(self):
+        return {"transaction_id": "tx-1", "status": self.status}
+
+
+def test_one_upstream_poll_for_many_waiters():
+    calls = []
+
+    async def fetch(transaction_id):
+        calls.append(transaction_id)
+        return FakeTransaction("Completed")
+
+    async def main():
+        watcher = TransactionWatcher(fetch, min_interval=0.01, max_interval=0.05)
+        return await asyncio.gather(
+            *(watcher.wait("tx-1", timeout=1) for _ in range(20))
+        )
+
+    snapshots = asyncio.run(main())
+    assert calls == ["tx-1"]
+    assert {s["transaction_status"] for s in snapshots} == {"Completed"}
+
+
+def test_webhook_wakes_waiter_and_backs_off_polling():
+    calls = []
+
+    async def fetch(transaction_id):
+        calls.append(transaction_id)
+        return FakeTransaction("Submitted")
+
+    async def main():
+        watcher = TransactionWatcher(fetch, min_interval=0.01, max_interval=10)
+        first = await watcher.wait("tx-1", timeout=1)
+        waiter = asyncio.create_task(watcher.wait("tx-1", "Submitted", timeout=5))
+        await asyncio.sleep(0.05)
+        polls_before_webhook = len(calls)
+        watcher.publish_webhook("tx-1", "Confirming", {"status": "Confirming"})
+        second = await waiter
+        return first, second, polls_before_webhook
+
+    first, second, polls_before_webhook = asyncio.run(main())
+    assert first["transaction_status"] == "Submitted"
+    assert second["transaction_status"] == "Confirming"
+    # Polling backs off while the status does not change
+    assert polls_before_webhook < 5
+
+
+def test_stream_ends_on_terminal_status():
+    statuses = iter(["Submitted", "Broadcasting", "Completed"])
+
+    async def fetch(transaction_id):
+        return FakeTransaction(next(statuses))
+
+    async def main():
+        watcher = TransactionWatcher(fetch, min_interval=0.01, max_interval=0.01)
+        return [
+            s["transaction_status"]
+            async for s in watcher.stream("tx-1", heartbeat=1)
+            if s is not None
+        ]
+
+    assert asyncio.run(main()) == ["Submitted", "Broadcasting", "Completed"]
+
+
+def test_unknown_transaction_fails_waiters_and_streams():
+    async def fetch(transaction_id):
+        raise ApiException(status=404, reason="Not Found")
+
+    async def main():
+        watcher = TransactionWatcher(fetch, min_interval=0.01, max_interval=0.01)
+        with pytest.raises(TransactionWatchError) as waited:
+            await watcher.wait("tx-404", timeout=5)
+        with pytest.raises(TransactionWatchError):
+            async for _ in watcher.stream("tx-404", heartbeat=5):
+                pass
+        return waited.value
+
+    assert asyncio.run(main()).status == 404
+
+
+def test_bad_payload_does_not_stop_polling_of_other_transactions():
+    class BrokenTransaction:
+        def to_dict(self):
+            raise ValueError("unexpected payload")
+
+    async def fetch(transaction_id):
+        if transaction_id == "tx-bad":
+            return BrokenTransaction()
+        return FakeTransaction("Completed")
+
+    async def main():
+        watcher = TransactionWatcher(fetch, min_interval=0.01, max_interval=0.01)
+        return await asyncio.gather(
+            watcher.wait("tx-bad", timeout=1),
+            watcher.wait("tx-1", timeout=1),
+            return_exceptions=True,
+        )
+
+    bad, good = asyncio.run(main())
+    assert isinstance(bad, TransactionWatchError)
+    assert good["transaction_status"] == "Completed"
+
+
+def test_transient_failures_keep_polling():
+    results = iter([ApiException(status=503), FakeTransaction("Completed")])
+
+    async def fetch(transaction_id):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def main():
+        watcher = TransactionWatcher(fetch, min_interval=0.01, max_interval=0.01)
+        return await watcher.wait("tx-1", timeout=1)
+
+    assert asyncio.run(main())["transaction_status"] == "Completed"
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from nacl.signing import SigningKey
+from app.main import app
+from app.api.dependencies import cobo_service
+from app.services.webhook_verifier import WebhookVerifier, WebhookVerificationError
+
+client = TestClient(app)
+signing_key = SigningKey.generate()
+public_key = bytes(signing_key.verify_key).hex()
+
+
+def sign(body: bytes, timestamp: str) -> str:
+    digest = hashlib.sha256(
+        hashlib.sha256(body + b"|" + timestamp.encode()).digest()
+    ).digest()
+    return signing_key.sign(digest).signature.hex()
+
+
+def signed_headers(body: bytes, timestamp: int = None) -> dict:
+    timestamp = str(timestamp or int(time.time() * 1000))
+    return {"Biz-Timestamp": timestamp, "Biz-Resp-Signature": sign(body, timestamp)}
+
+
+def test_verifier_accepts_once_and_rejects_replays():
+    verifier = WebhookVerifier(public_key)
+    body = b'{"type": "wallets.transaction.updated"}'
+    headers = signed_headers(body)
+    verifier.verify(body, headers["Biz-Timestamp"], headers["Biz-Resp-Signature"])
+    with pytest.raises(WebhookVerificationError, match="Replayed"):
+        verifier.verify(body, headers["Biz-Timestamp"], headers["Biz-Resp-Signature"])
+
+
+def test_verifier_rejects_bad_events():
+    verifier = WebhookVerifier(public_key, tolerance=60)
+    body = b'{"type": "wallets.transaction.updated"}'
+    headers = signed_headers(body)
+    with pytest.raises(WebhookVerificationError, match="Missing"):
+        verifier.verify(body, None, None)
+    with pytest.raises(WebhookVerificationError, match="Invalid"):
+        verifier.verify(
+            body + b" ", headers["Biz-Timestamp"], headers["Biz-Resp-Signature"]
+        )
+    stale = signed_headers(body, int(time.time() * 1000) - 120_000)
+    with pytest.raises(WebhookVerificationError, match="tolerance"):
+        verifier.verify(body, stale["Biz-Timestamp"], stale["Biz-Resp-Signature"])
+
+
+def test_webhook_endpoint(monkeypatch):
+    body = json.dumps({"type": "wallets.transaction.created", "data": {}}).encode()
+    monkeypatch.setattr(cobo_service, "webhook_verifier", None)
+    assert client.post("/api/webhook", content=body).status_code == 503
+
+    monkeypatch.setattr(cobo_service, "webhook_verifier", WebhookVerifier(public_key))
+    assert client.post("/api/webhook", content=body).status_code == 401
+    response = client.post("/api/webhook", content=body, headers=signed_headers(body))
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"